@@ -1,75 +1,149 @@
 from io import StringIO
+import gzip
+import hashlib
+import importlib
+import importlib.util
+import json
+import logging
 import os
 import re
+import sys
+import tempfile
+import threading
 from datetime import datetime, date, timedelta
+from bisect import bisect_left, bisect_right
+from collections import OrderedDict
+from functools import lru_cache
 from itertools import cycle
 from typing import TextIO, Dict
 
-PANDAS_INSTALLED = False
 
-try:
-    import pandas as pd
-    import numpy as np
+class _LazyModule(object):
+    """
+    Stand-in for a module that is imported on first attribute access.
 
-    PANDAS_INSTALLED = True
+    The imported module replaces the stand-in in this module's namespace,
+    so only the first access pays the lookup.
+    """
 
-    def isnull(x):
-        return pd.isna(x)
+    def __init__(self, name, alias):
+        self._name = name
+        self._alias = alias
 
-    def recseq(gen, typo="DatetimeIndex"):
-        g = list(gen)
-        if get_option("mode") == "pandas":
-            if typo == "DatetimeIndex":
-                return pd.DatetimeIndex(g)
-            elif typo == "array":
-                return np.array(g)
-        else:
-            return g
+    def __getattr__(self, attr):
+        module = importlib.import_module(self._name)
+        globals()[self._alias] = module
+        return getattr(module, attr)
 
-    def retdate(dt):
-        if get_option("mode.datetype") == "datetime":
-            return datetime(dt.year, dt.month, dt.day)
-        elif get_option("mode.datetype") == "date":
-            return dt
-        elif get_option("mode.datetype") == "iso":
-            return dt.isoformat()
-        elif get_option("mode") == "pandas":
-            return pd.to_datetime(dt)
-        else:
-            return dt
 
-    def return_none():
-        if get_option("mode") == "pandas":
-            return pd.NA
-        else:
-            return None
+# numpy and pandas are imported when first used, `import bizdays` doesn't
+# pay for them
+np = _LazyModule("numpy", "np")
+pd = _LazyModule("pandas", "pd")
 
-except ImportError:
+NUMPY_INSTALLED = importlib.util.find_spec("numpy") is not None
+PANDAS_INSTALLED = importlib.util.find_spec("pandas") is not None
 
-    def isnull(x):
-        return x is None
 
-    def recseq(gen, typo=None):
-        return list(gen)
+def _isndarray(x):
+    # an array can only exist if numpy has already been imported
+    numpy = sys.modules.get("numpy")
+    return numpy is not None and isinstance(x, numpy.ndarray)
+
+
+def isnull(x):
+    if x is None:
+        return True
+    t = type(x)
+    if t is date or t is datetime or t is str or t is int:
+        return False
+    pandas = sys.modules.get("pandas")
+    if pandas is not None:
+        return pandas.isna(x)
+    # NaN and NaT are the only values not equal to themselves
+    return x != x
+
+
+def recseq(gen, typo="DatetimeIndex"):
+    pandas_mode = get_option("mode") == "pandas"
+    if _isndarray(gen):
+        if pandas_mode and typo == "array":
+            if isinstance(gen, np.ma.MaskedArray):
+                # nullable boolean and integer arrays, masked positions are NA
+                if gen.dtype.kind == "b":
+                    return pd.arrays.BooleanArray(gen.data, gen.mask)
+                return pd.arrays.IntegerArray(gen.data, gen.mask)
+            return gen
+        if gen.dtype.kind == "M":
+            return _retdates(gen, pandas_mode)
+        return gen.tolist()
+    g = list(gen)
+    if pandas_mode:
+        if typo == "DatetimeIndex":
+            return pd.DatetimeIndex(g)
+        elif typo == "array":
+            return np.array(g)
+    else:
+        return g
+
+
+def _retdates(dts, pandas_mode):
+    # materializes an array of datetime64 dates in one conversion: a
+    # DatetimeIndex in pandas mode (mode.datetype is ignored) or a list of
+    # the mode.datetype objects, NaT becomes None
+    if pandas_mode:
+        return pd.DatetimeIndex(dts.astype("datetime64[s]"))
+    datetype = get_option("mode.datetype")
+    if datetype == "datetime":
+        return dts.astype("datetime64[us]").tolist()
+    elif datetype == "iso":
+        dts = dts.astype("datetime64[D]")
+        isos = np.datetime_as_string(dts)
+        nat = np.isnat(dts)
+        if nat.any():
+            isos = isos.astype(object)
+            isos[nat] = None
+        return isos.tolist()
+    else:
+        return dts.astype("datetime64[D]").tolist()
+
+
+def retdate(dt):
+    datetype = get_option("mode.datetype")
+    if datetype == "datetime":
+        return datetime(dt.year, dt.month, dt.day)
+    elif datetype == "date":
+        return dt
+    elif datetype == "iso":
+        return dt.isoformat()
+    elif get_option("mode") == "pandas":
+        return pd.to_datetime(dt)
+    else:
+        return dt
 
-    def retdate(dt):
-        if get_option("mode.datetype") == "datetime":
-            return datetime(dt.year, dt.month, dt.day)
-        elif get_option("mode.datetype") == "date":
-            return dt
-        elif get_option("mode.datetype") == "iso":
-            return dt.isoformat()
-        else:
-            return dt
 
-    def return_none():
+def return_none():
+    if get_option("mode") == "pandas":
+        return pd.NA
+    else:
         return None
 
 
-__all__ = ["get_option", "set_option", "Calendar"]
+__all__ = [
+    "get_option",
+    "set_option",
+    "Calendar",
+    "CalendarRegistry",
+    "CalendarSet",
+    "GetdatePlan",
+    "compile_getdate",
+    "get_calendar",
+]
+
 
+options = {"mode": "python", "cache": True}
 
-options = {"mode": "python"}
+logger = logging.getLogger(__name__)
 
 
 def get_option(name):
@@ -102,12 +176,13 @@ def set_option(name, val):
     -------
         No return
     """
-    if name == "pandas" and not PANDAS_INSTALLED:
+    if name == "mode" and val == "pandas" and not PANDAS_INSTALLED:
         raise Exception("Cannot set mode pandas: pandas not installed")
     options[name] = val
 
 
 D1 = timedelta(1)
+EPOCH = date(1970, 1, 1).toordinal()
 
 
 def isstr(d):
@@ -115,7 +190,10 @@ def isstr(d):
 
 
 def isseq(seq):
-    if isstr(seq):
+    t = type(seq)
+    if t is str or t is date or t is datetime or t is int:
+        return False
+    if isstr(seq) or isinstance(seq, date):
         return False
     try:
         iter(seq)
@@ -129,6 +207,202 @@ class DateOutOfRange(Exception):
     pass
 
 
+def _todate(dt):
+    # scalars are dispatched on their exact type, Date handles the rest
+    t = type(dt)
+    if t is date:
+        return dt
+    if t is datetime:
+        return dt.date()
+    if t is str and len(dt) == 10 and dt[4] == dt[7] == "-":
+        try:
+            return date.fromisoformat(dt)
+        except ValueError:
+            pass
+    elif isinstance(dt, datetime):
+        return dt.date()
+    return Date(dt).date
+
+
+def _checkerrors(errors):
+    if errors not in ("raise", "coerce", "clip"):
+        raise ValueError("Invalid errors: %s" % errors)
+
+
+def _strpdate(dt, format):
+    # strings are parsed with the given format, other dates pass through
+    if format is not None and isstr(dt):
+        return datetime.strptime(dt, format).date()
+    return dt
+
+
+def _ordinal(dt):
+    return _todate(dt).toordinal() - EPOCH
+
+
+def _fromordinal(o):
+    return date.fromordinal(int(o) + EPOCH)
+
+
+def _weekday(o):
+    # 1970-01-01 is a Thursday
+    return (o + 3) % 7
+
+
+def _asordinals(dates, format=None, ordinals=False):
+    """
+    Converts a sequence of dates into an int32 array of ordinals and a mask
+    of null values.
+
+    This is the conversion shared by the vectorized methods. Accepts
+    sequences of ISO strings, dates, datetimes and Timestamps, datetime64
+    arrays of any unit, pandas Series and DatetimeIndex, tz-aware values
+    keep their local dates. Strings are parsed with `format` when it's
+    given, as ISO dates otherwise. Integers are rejected, unless
+    `ordinals` is set, for the indexes rebuilt from their own ordinals.
+
+    Returns None if the dates can't be converted.
+    """
+    pandas = sys.modules.get("pandas")
+    if pandas is not None and isinstance(dates, (pandas.Series, pandas.Index)):
+        if isinstance(dates.dtype, pandas.DatetimeTZDtype):
+            if isinstance(dates, pandas.Series):
+                dates = dates.dt.tz_localize(None)
+            else:
+                dates = dates.tz_localize(None)
+        dates = dates.to_numpy()
+    if isinstance(dates, list) and set(map(type, dates)) <= {date, datetime}:
+        arr = _fromdates(dates)
+    else:
+        arr = np.asarray(dates)
+        if arr.ndim == 0:
+            return None
+        arr = _asdatetime64(arr, format, ordinals)
+    if arr is None:
+        return None
+    nulls = np.isnat(arr)
+    ords = arr.view(np.int64).astype(np.int32)
+    if nulls.any():
+        ords[nulls] = 0
+    return ords, nulls
+
+
+def _asdatetime64(arr, format=None, ordinals=False):
+    # datetime64[D] array of the dates, NaT for nulls
+    kind = arr.dtype.kind
+    if kind == "M" or (ordinals and kind in "iu"):
+        return arr.astype("datetime64[D]")
+    if kind == "O":
+        types = set(map(type, arr))
+        if types <= {date, datetime}:
+            return _fromdates(arr.tolist())
+        types.discard(type(None))
+        if types != {str}:
+            return _asdatetime64_objects(arr, format)
+    elif kind not in "US":
+        return None
+    if format is None:
+        try:
+            return arr.astype("datetime64[D]")
+        except ValueError:
+            # not ISO formatted, like 2024-1-5
+            return _asdatetime64_objects(arr, format)
+    if PANDAS_INSTALLED:
+        try:
+            return pd.to_datetime(arr, format=format).to_numpy().astype("datetime64[D]")
+        except (ValueError, TypeError):
+            return None
+    return _asdatetime64_objects(arr, format)
+
+
+def _fromdates(values):
+    # NumPy's conversion of date objects is much slower
+    ords = np.array([d.toordinal() for d in values], dtype=np.int64) - EPOCH
+    return ords.view("datetime64[D]")
+
+
+def _asdatetime64_objects(arr, format=None):
+    # element by element conversion of mixed types
+    nat = np.datetime64("NaT").view(np.int64)
+    ords = []
+    try:
+        for d in arr.tolist():
+            if isnull(d):
+                ords.append(nat)
+            elif format is not None and isstr(d):
+                ords.append(datetime.strptime(d, format).toordinal() - EPOCH)
+            else:
+                ords.append(_ordinal(d))
+    except (ValueError, TypeError):
+        return None
+    return np.array(ords, dtype=np.int64).view("datetime64[D]")
+
+
+def _ordinalarray(dates, format=None):
+    # ordinals of a date or a sequence of dates, null dates are not allowed
+    if not isseq(dates):
+        dates = [dates]
+    res = _asordinals(dates, format)
+    if res is None:
+        raise ValueError("Invalid dates")
+    if res[1].any():
+        raise ValueError("Null dates")
+    return res[0]
+
+
+def _onvalid(func, nulls, *arrays):
+    # applies func to the non-null positions of the arrays only, dates get
+    # NaT at the null positions and other results are masked there
+    if not nulls.any():
+        return func(*arrays)
+    valid = ~nulls
+    res = func(*[a[valid] for a in arrays])
+    if res.dtype.kind == "M":
+        out = np.full(len(nulls), np.datetime64("NaT"), dtype=res.dtype)
+        out[valid] = res
+        return out
+    out = np.zeros(len(nulls), dtype=res.dtype)
+    out[valid] = res
+    return np.ma.masked_array(out, nulls)
+
+
+def _sortedin(a, v):
+    # mask of the values of v found in the sorted array a
+    if len(a) == 0:
+        return np.zeros(len(v), dtype=bool)
+    i = np.minimum(np.searchsorted(a, v), len(a) - 1)
+    return a[i] == v
+
+
+def _weekdaymask(o1, o2, weekdays, holidays=()):
+    # holiday mask of the days between the ordinals o1 and o2 (inclusive)
+    # from the nonworking weekdays and the sorted holiday ordinals
+    nonwork = np.zeros(7, dtype=bool)
+    nonwork[list(weekdays)] = True
+    mask = nonwork[_weekday(np.arange(o1, o2 + 1))]
+    hol = np.asarray(holidays, dtype=np.int64)
+    hol = hol[np.searchsorted(hol, o1) : np.searchsorted(hol, o2, "right")]
+    mask[hol - o1] = True
+    return mask
+
+
+def _countweekdays(a, b, weekdays):
+    # number of days between the ordinals a and b (inclusive) falling on
+    # the given weekdays
+    n = 0
+    for wd in weekdays:
+        r = (wd - 3) % 7
+        n = n + (b - r) // 7 - (a - 1 - r) // 7
+    return n
+
+
+def _nthindex(n, size):
+    i = n - 1 if n > 0 else n
+    if i < -size or i >= size:
+        raise IndexError("list index out of range")
+    return i % size
+
+
 def find_date_pos(col, dt):
     beg = 0
     end = len(col)
@@ -144,9 +418,9 @@ def find_date_pos(col, dt):
 
 
 def __daterangecheck(obj, dt):
-    dt = Date(dt).date
+    dt = _todate(dt)
     if dt > obj.enddate or dt < obj.startdate:
-        raise DateOutOfRange("Given date out of calendar range")
+        obj._extend(dt, dt)
     return dt
 
 
@@ -174,20 +448,127 @@ def load_holidays(fname, format="%Y-%m-%d"):
         file not found (%s)"
             % fname
         )
-    _holidays = []
-    with open(fname) as fcal:
-        for cal_reg in fcal:
-            cal_reg = cal_reg.strip()
-            if cal_reg == "":
-                continue
-            _holidays.append(Date(cal_reg, format=format).date)
-    return _holidays
+    with _opentext(fname) as fcal:
+        lines = [line.strip() for line in fcal.read().splitlines()]
+    lines = [line for line in lines if line]
+    if NUMPY_INSTALLED and format == "%Y-%m-%d":
+        # ISO dates are parsed at once
+        return np.array(lines, dtype="datetime64[D]").tolist()
+    return [Date(line, format=format).date for line in lines]
+
+
+def _getnth(nth):
+    if nth == "first":
+        return 1
+    elif nth == "second":
+        return 2
+    elif nth == "third":
+        return 3
+    elif nth == "last":
+        return -1
+    elif nth[-2:] in ("th", "st", "nd", "rd"):
+        return int(nth[:-2])
+    else:
+        raise ValueError("invalid nth:", nth)
+
+
+class GetdatePlan(object):
+    """
+    A compiled getdate expression.
+
+    The expression is parsed once, into the date index methods that select
+    the n-th day, business day or weekday of a year or month and, for
+    expressions like ``"3rd bizday after 15th day"``, move from it. Plans
+    are created by :func:`compile_getdate` and called with a calendar and a
+    year (and month), they can be given to :meth:`Calendar.getdate` in
+    place of the expression.
+
+    Parameters
+    ----------
+
+    expr : str
+        getdate expression, see :doc:`getdate`.
+    """
+
+    def __init__(self, expr):
+        self.expr = expr
+        tok = expr.split()
+        if len(tok) == 2:
+            self._select = self.__nthday(_getnth(tok[0]), tok[1], "_getnth%s")
+            self._move = None
+        elif len(tok) == 5:
+            n = _getnth(tok[3])
+            if tok[4] not in ("day", "bizday"):
+                raise ValueError("Invalid reference day:", tok[4])
+            self._select = ("_getnth%spos" % tok[4], (n,))
+            m = {"before": -1, "after": 1}.get(tok[2], 0)
+            if not m:
+                raise ValueError("Invalid operator:", tok[2])
+            # last counts as first when moving from the reference day
+            n = (1 if tok[0] == "last" else _getnth(tok[0])) * m
+            self._move = self.__nthday(n, tok[1], "_getnth%s_beforeafter")
+        else:
+            raise ValueError("Invalid expression:", expr)
+
+    @staticmethod
+    def __nthday(n, day, method):
+        # the index method and its arguments for the given day
+        if day in ("day", "bizday"):
+            return (method % day, (n,))
+        elif day in DateIndex.WEEKDAYS:
+            return (method % "weekday", (n, day))
+        else:
+            raise ValueError("Invalid day:", day)
+
+    def _apply(self, index, year, month=None):
+        index._coveryear(year)
+        method, args = self._select
+        res = getattr(index, method)(*args, year, month)
+        if self._move is None:
+            return res
+        method, args = self._move
+        return getattr(index, method)(*args, res)
+
+    def __call__(self, calendar, year, month=None):
+        return calendar.getdate(self, year, month)
+
+    def __repr__(self):
+        return "GetdatePlan(%r)" % self.expr
+
+
+@lru_cache(maxsize=256)
+def compile_getdate(expr):
+    """
+    Compiles a getdate expression.
+
+    Compiled expressions are cached, so getdate calls with the same
+    expression parse it once.
+
+    Parameters
+    ----------
+
+    expr : str
+        getdate expression, see :doc:`getdate`.
+
+    Returns
+    -------
+    GetdatePlan
+        A callable taking a calendar, a year and a month, that returns the
+        same as ``calendar.getdate(expr, year, month)``.
+    """
+    return GetdatePlan(expr)
 
 
 class DateIndex(object):
     WEEKDAYS = ("mon", "tue", "wed", "thu", "fri", "sat", "sun")
-
-    def __init__(self, holidays, startdate, enddate, weekdays):
+    vectorized = False
+    name = None
+    # business days before the first date of the range that was given, the
+    # counts don't change when the range is extended backwards
+    _k0 = 0
+
+    def __init__(self, holidays, startdate, enddate, weekdays, extend=False):
+        self.extend = extend
         self._index = {}
         self._bizdays = []
         self._days = []
@@ -204,10 +585,11 @@ class DateIndex(object):
             dts.append(dt)
             dt = dt + D1
 
-        w = 0
+        w = -self._k0
         c = 1
+        holidays = set(self.holidays)
         for dt in dts:
-            is_hol = dt in self.holidays or dt.weekday() in weekdays
+            is_hol = dt in holidays or dt.weekday() in weekdays
             if not is_hol:
                 w += 1
                 self._bizdays.append(dt)
@@ -236,48 +618,96 @@ class DateIndex(object):
             self._days.append(dt)
             # ----
 
+    def _extend(self, dt1, dt2):
+        # grows the range, in whole years, to include the dates dt1 and dt2
+        if not self.extend:
+            raise DateOutOfRange("Given date out of calendar range")
+        startdate = min(self.startdate, date(dt1.year, 1, 1))
+        enddate = max(self.enddate, date(dt2.year, 12, 31))
+        self._rebuild(startdate, enddate)
+        logger.info(
+            "Calendar %s range extended to %s - %s",
+            self.name,
+            startdate,
+            enddate,
+            extra={"calendar": self.name, "startdate": startdate, "enddate": enddate},
+        )
+
+    def _rebuild(self, startdate, enddate):
+        holidays = set(self.holidays)
+        dt = startdate
+        while dt < self.startdate:
+            if not (dt in holidays or dt.weekday() in self.weekdays):
+                self._k0 += 1
+            dt = dt + D1
+        self.__init__(self.holidays, startdate, enddate, self.weekdays, self.extend)
+
+    def _extendbizdays(self, p1, p2):
+        # extends the range to include the business days at the positions
+        # p1 and p2 (1-based, counted from the range's start)
+        n = len(self._bizdays)
+        dt1 = self.startdate
+        dt2 = self.enddate
+        # a year has more than 200 business days in most calendars, the
+        # callers extend again if it's not enough
+        if p1 < 1:
+            dt1 = date(dt1.year - (1 - p1) // 200 - 1, 1, 1)
+        if p2 > n:
+            dt2 = date(dt2.year + (p2 - n) // 200 + 1, 12, 31)
+        self._extend(dt1, dt2)
+
+    def _coveryear(self, year):
+        if self.extend and not (self.startdate.year <= year <= self.enddate.year):
+            self._extend(date(year, 1, 1), date(year, 12, 31))
+
+    def _bizday(self, k):
+        # the k-th business day
+        while not 0 < k + self._k0 <= len(self._bizdays):
+            self._extendbizdays(k + self._k0, k + self._k0)
+        return self._bizdays[k - 1 + self._k0]
+
     @daterangecheck
     def offset(self, dt, n):
         if n > 0:
-            pos = self._index[dt][0] - 1 + n
+            k = self._index[dt][0] + n
         elif n < 0:
-            pos = self._index[dt][3] - 1 + n
+            k = self._index[dt][3] + n
         else:
             return dt
-        return self._bizdays[pos]
+        return self._bizday(k)
+
+    def _following(self, dt):
+        return self._bizday(self._index[dt][3])
+
+    def _preceding(self, dt):
+        return self._bizday(self._index[dt][0])
 
     @daterangecheck
     def following(self, dt):
-        if not self._index[dt][2]:
-            return dt
-        else:
-            return self.following(dt + D1)
+        return self._following(dt)
 
     @daterangecheck
     def modified_following(self, dt):
-        dtx = self.following(dt)
-        if dtx.month != dt.month:
-            dtx = self.preceding(dt)
+        dtx = self._following(dt)
+        if (dtx.year, dtx.month) != (dt.year, dt.month):
+            dtx = self._preceding(dt)
         return dtx
 
     @daterangecheck
     def preceding(self, dt):
-        if not self._index[dt][2]:
-            return dt
-        else:
-            return self.preceding(dt - D1)
+        return self._preceding(dt)
 
     @daterangecheck
     def modified_preceding(self, dt):
-        dtx = self.preceding(dt)
-        if dtx.month != dt.month:
-            dtx = self.following(dt)
+        dtx = self._preceding(dt)
+        if (dtx.year, dtx.month) != (dt.year, dt.month):
+            dtx = self._following(dt)
         return dtx
 
     @daterangecheck2
     def seq(self, dt1, dt2):
-        pos1 = max(self._index[dt1][0], self._index[dt1][3]) - 1
-        pos2 = min(self._index[dt2][0], self._index[dt2][3])
+        pos1 = max(self._index[dt1][0], self._index[dt1][3]) - 1 + self._k0
+        pos2 = min(self._index[dt2][0], self._index[dt2][3]) + self._k0
         return self._bizdays[pos1:pos2]
 
     @daterangecheck
@@ -285,71 +715,16 @@ class DateIndex(object):
         return self._index[dt]
 
     def getbizdays(self, year, month=None):
+        self._coveryear(year)
         if month:
             return sum(not d[3] for d in self._years[year] if d[1] == month)
         else:
             return sum(not d[3] for d in self._years[year])
 
     def getdate(self, expr, year, month=None):
-        tok = expr.split()
-        if len(tok) == 2:
-            n = self._getnth(tok[0])
-            if tok[1] == "day":
-                return self._getnthday(n, year, month)
-            elif tok[1] == "bizday":
-                return self._getnthbizday(n, year, month)
-            elif tok[1] in self.WEEKDAYS:
-                return self._getnthweekday(n, tok[1], year, month)
-            else:
-                raise ValueError("Invalid day:", tok[1])
-        elif len(tok) == 5:
-            n = self._getnth(tok[3])
-            if tok[4] == "day":
-                pos = self._getnthdaypos(n, year, month)
-            elif tok[4] == "bizday":
-                pos = self._getnthbizdaypos(n, year, month)
-            else:
-                raise ValueError("Invalid reference day:", tok[4])
-            m = {"before": -1, "after": 1}.get(tok[2], 0)
-            if not m:
-                raise ValueError("Invalid operator:", tok[2])
-            n = self._getnthpos(tok[0]) * m
-            if tok[1] == "day":
-                return self._getnthday_beforeafter(n, pos)
-            elif tok[1] == "bizday":
-                return self._getnthbizday_beforeafter(n, pos)
-            elif tok[1] in self.WEEKDAYS:
-                return self._getnthweekday_beforeafter(n, tok[1], pos)
-            else:
-                raise ValueError("Invalid day:", tok[1])
-
-    def _getnthpos(self, nth):
-        if nth == "first":
-            return 1
-        elif nth == "second":
-            return 2
-        elif nth == "third":
-            return 3
-        elif nth == "last":
-            return 1
-        elif nth[-2:] in ("th", "st", "nd", "rd"):
-            return int(nth[:-2])
-        else:
-            raise ValueError("invalid nth:", nth)
-
-    def _getnth(self, nth):
-        if nth == "first":
-            return 1
-        elif nth == "second":
-            return 2
-        elif nth == "third":
-            return 3
-        elif nth == "last":
-            return -1
-        elif nth[-2:] in ("th", "st", "nd", "rd"):
-            return int(nth[:-2])
-        else:
-            raise ValueError("invalid nth:", nth)
+        if not isinstance(expr, GetdatePlan):
+            expr = compile_getdate(expr)
+        return expr._apply(self, year, month)
 
     def _getnthdaypos(self, n, year, month=None):
         n = n - 1 if n > 0 else n
@@ -365,7 +740,7 @@ class DateIndex(object):
                 self._years[year][n][4] - 1,
                 self._years[year][n][5] - 1,
                 self._years[year][n][0],
-                self._years[year][n][6],
+                self._years[year][n][6] - 1,
             )
 
     def _getnthbizdaypos(self, n, year, month=None):
@@ -406,10 +781,10 @@ class DateIndex(object):
 
     def _getnthbizday_beforeafter(self, n1, pos):
         if n1 > 0:
-            pos = pos[1] + n1
+            k = pos[1] + n1
         else:
-            pos = pos[3] + n1
-        return self._bizdays[pos]
+            k = pos[3] + n1
+        return self._bizday(k + 1)
 
     def _getnthweekday_beforeafter(self, n1, weekday, pos):
         dt = pos[2]
@@ -425,7 +800,7 @@ class DateIndex(object):
 
     def _getnthbizday(self, n, year, month=None):
         pos = self._getnthbizdaypos(n, year, month)[1]
-        return self._bizdays[pos]
+        return self._bizday(pos + 1)
 
     def _getnthweekday(self, n, weekday, year, month=None):
         n = n - 1 if n > 0 else n
@@ -442,6 +817,799 @@ class DateIndex(object):
     def __getitem__(self, dt):
         return self.get(dt)
 
+    def update(self, dates, add=True):
+        """
+        Returns a new index with the given dates added to or removed from
+        the holidays.
+        """
+        dates = [Date(d).date for d in dates]
+        if add:
+            current = set(self.holidays)
+            holidays = self.holidays + [d for d in dates if d not in current]
+        else:
+            removed = set(dates)
+            holidays = [d for d in self.holidays if d not in removed]
+        index = type(self)(
+            holidays, self.startdate, self.enddate, self.weekdays, self.extend
+        )
+        index.name = self.name
+        return index
+
+    def _maskrange(self, o1, o2):
+        # holiday mask of the days between the ordinals o1 and o2
+        hol = np.unique(np.array(self.holidays, dtype="datetime64[D]").view(np.int64))
+        return _weekdaymask(o1, o2, self.weekdays, hol)
+
+    def __get_nbytes(self):
+        # containers only, the date objects are not counted
+        return (
+            sys.getsizeof(self._index)
+            + sum(sys.getsizeof(v) for v in self._index.values())
+            + sys.getsizeof(self._bizdays)
+            + sys.getsizeof(self._days)
+        )
+
+    nbytes = property(__get_nbytes)
+
+
+class ArrayDateIndex(DateIndex):
+    """
+    DateIndex backed by NumPy arrays
+
+    Days are stored as offsets from ``startdate`` (``pos``) in contiguous
+    arrays: a holiday mask, the forward and backward cumulative counts of
+    business days, the month of each day and the business days themselves
+    as ``datetime64[D]``.
+    The backward and forward counts are the positions of the next and
+    previous business days in the business days array, so adjustments are
+    a single lookup.
+    Dates are handled internally as ordinals, the number of days since
+    1970-01-01.
+
+    The arrays are filled lazily, one year (chunk) at a time, when a date
+    of that year is first accessed.
+    The number of business days of every year is computed at construction
+    from weekday counts and the holidays, so the cumulative counts of
+    distant years are consistent regardless of the years that have been
+    loaded.
+    """
+
+    vectorized = True
+
+    def __init__(self, holidays, startdate, enddate, weekdays, extend=False):
+        self.extend = extend
+        self.startdate = Date(startdate).date
+        self.enddate = Date(enddate).date
+        self.weekdays = weekdays
+        self._start = _ordinal(self.startdate)
+        self._end = _ordinal(self.enddate)
+        hol = _asordinals(holidays, ordinals=True)[0].astype(np.int64)
+        # bundled calendars are already sorted and unique
+        if hol.size > 1 and not (hol[1:] > hol[:-1]).all():
+            hol = np.unique(hol)
+        self._holidays = hol
+
+        hol = self._holidays
+        hol = hol[(hol >= self._start) & (hol <= self._end)]
+        # holidays on nonworking weekdays don't change the counts
+        nonwork = np.zeros(7, dtype=bool)
+        nonwork[list(weekdays)] = True
+        self._effholidays = hol[~nonwork[_weekday(hol)]]
+
+        self._initchunks()
+
+        ndays = self._end - self._start + 1
+        self._holmask = np.empty(ndays, dtype=bool)
+        self._fwd = np.empty(ndays, dtype=np.int32)
+        self._bwd = np.empty(ndays, dtype=np.int32)
+        self._months = np.empty(ndays, dtype=np.int32)
+        self._bizdays = np.empty(self._base[-1], dtype="datetime64[D]")
+
+    def _initchunks(self):
+        # year chunks and the number of business days before each chunk
+        years = np.arange(self.startdate.year + 1, self.enddate.year + 1) - 1970
+        starts = years.astype("datetime64[Y]").astype("datetime64[D]").view(np.int64)
+        chunks = np.concatenate([[self._start], starts, [self._end + 1]]).astype(
+            np.int64
+        )
+        a, b = chunks[:-1], chunks[1:] - 1
+        nhol = np.searchsorted(self._effholidays, b, "right") - np.searchsorted(
+            self._effholidays, a, "left"
+        )
+        nbiz = b - a + 1 - _countweekdays(a, b, self.weekdays) - nhol
+        self._chunks = chunks.tolist()
+        self._base = [0] + np.cumsum(nbiz).tolist()
+        self._loaded = [False] * (len(chunks) - 1)
+        self._nloaded = 0
+        self._loadlock = threading.Lock()
+
+    def __get_holidays(self):
+        return [_fromordinal(o) for o in self._holidays]
+
+    holidays = property(__get_holidays)
+
+    _arrays = (
+        "_holidays",
+        "_effholidays",
+        "_holmask",
+        "_fwd",
+        "_bwd",
+        "_months",
+        "_bizdays",
+    )
+
+    def __get_nbytes(self):
+        return sum(getattr(self, k).nbytes for k in self._arrays)
+
+    nbytes = property(__get_nbytes)
+
+    def update(self, dates, add=True):
+        """
+        Returns a new index with the given dates added to or removed from
+        the holidays.
+
+        The holiday mask and the cumulative counts are patched from the
+        first affected day onward, arrays that don't change are shared with
+        this index.
+        """
+        ords = np.unique(_asordinals(dates)[0]).astype(np.int64)
+        found = _sortedin(self._holidays, ords)
+        if add:
+            ords = ords[~found]
+            holidays = np.insert(
+                self._holidays, np.searchsorted(self._holidays, ords), ords
+            )
+        else:
+            ords = ords[found]
+            holidays = np.delete(self._holidays, np.searchsorted(self._holidays, ords))
+        # only holidays on working weekdays within the range change the index
+        nonwork = np.zeros(7, dtype=bool)
+        nonwork[list(self.weekdays)] = True
+        ords = ords[(ords >= self._start) & (ords <= self._end)]
+        ords = ords[~nonwork[_weekday(ords)]]
+        for o in ords.tolist():
+            self._load(o, o)
+
+        index = type(self).__new__(type(self))
+        index.name = self.name
+        index.extend = self.extend
+        index._k0 = self._k0
+        index.startdate = self.startdate
+        index.enddate = self.enddate
+        index.weekdays = self.weekdays
+        index._start = self._start
+        index._end = self._end
+        index._holidays = holidays
+        eff = self._effholidays
+        if add:
+            index._effholidays = np.insert(eff, np.searchsorted(eff, ords), ords)
+        else:
+            index._effholidays = np.delete(eff, np.searchsorted(eff, ords))
+        index._chunks = self._chunks
+        # holidays in a chunk change the number of business days before
+        # the following chunks
+        counts = np.bincount(
+            np.searchsorted(self._chunks, ords, "right"), minlength=len(self._base)
+        )
+        shift = np.cumsum(counts) * (-1 if add else 1)
+        index._base = (np.asarray(self._base) + shift).tolist()
+        index._loaded = list(self._loaded)
+        index._nloaded = self._nloaded
+        index._loadlock = threading.Lock()
+        index._months = self._months
+        if len(ords) == 0:
+            index._holmask = self._holmask
+            index._fwd = self._fwd
+            index._bwd = self._bwd
+            index._bizdays = self._bizdays
+            return index
+
+        pos = ords - self._start
+        p0 = pos[0]
+        holmask = self._holmask.copy()
+        holmask[pos] = add
+        steps = np.zeros(len(holmask) - p0, dtype=np.int32)
+        steps[pos - p0] = -1 if add else 1
+        fwd = self._fwd.copy()
+        fwd[p0:] += np.cumsum(steps, dtype=np.int32)
+        bwd = self._bwd.copy()
+        bwd[p0:] = fwd[p0:] + holmask[p0:]
+        # counts are relative to the first business day of the original
+        # range, _k0 shifts them to positions in _bizdays
+        if add:
+            bizdays = np.delete(self._bizdays, self._fwd[pos] + self._k0 - 1)
+        else:
+            bizdays = np.insert(
+                self._bizdays, self._fwd[pos] + self._k0, ords.astype("datetime64[D]")
+            )
+        index._holmask = holmask
+        index._fwd = fwd
+        index._bwd = bwd
+        index._bizdays = bizdays
+        return index
+
+    def share(self, meta):
+        """
+        Copies the index into a new shared memory block.
+
+        The block starts with the size of a JSON header, holding `meta`, the
+        index attributes and the layout of the arrays, followed by the
+        arrays aligned to 8 bytes.
+        """
+        from multiprocessing import shared_memory
+
+        self._load(self._start, self._end)
+        specs = []
+        size = 0
+        for k in self._arrays:
+            a = getattr(self, k)
+            specs.append([k, a.dtype.str, size, a.size])
+            size += -(-a.nbytes // 8) * 8
+        meta = dict(
+            meta,
+            startdate=self.startdate.isoformat(),
+            enddate=self.enddate.isoformat(),
+            weekdays=list(self.weekdays),
+            extend=self.extend,
+            k0=self._k0,
+            arrays=specs,
+        )
+        header = json.dumps(meta).encode("utf-8")
+        offset = 8 + -(-len(header) // 8) * 8
+        shm = shared_memory.SharedMemory(create=True, size=offset + size)
+        shm.buf[:8] = len(header).to_bytes(8, "little")
+        shm.buf[8 : 8 + len(header)] = header
+        for k, dtype, pos, n in specs:
+            a = np.ndarray(n, dtype, buffer=shm.buf, offset=offset + pos)
+            a[:] = getattr(self, k)
+        return shm
+
+    @classmethod
+    def attach(cls, name):
+        """
+        Builds an index over the arrays of a shared memory block created by
+        `share`, without copying them.
+
+        Returns the index and the block's meta data.
+        """
+        from multiprocessing import shared_memory
+
+        shm = shared_memory.SharedMemory(name=name)
+        n = int.from_bytes(shm.buf[:8], "little")
+        meta = json.loads(bytes(shm.buf[8 : 8 + n]).decode("utf-8"))
+        offset = 8 + -(-n // 8) * 8
+        index = cls.__new__(cls)
+        index.startdate = Date(meta["startdate"]).date
+        index.enddate = Date(meta["enddate"]).date
+        index.weekdays = meta["weekdays"]
+        index.extend = meta["extend"]
+        index._k0 = meta["k0"]
+        index._start = _ordinal(index.startdate)
+        index._end = _ordinal(index.enddate)
+        for k, dtype, pos, size in meta["arrays"]:
+            a = np.ndarray(size, dtype, buffer=shm.buf, offset=offset + pos)
+            a.flags.writeable = False
+            setattr(index, k, a)
+        index._initchunks()
+        index._loaded = [True] * len(index._loaded)
+        index._nloaded = len(index._loaded)
+        index._shm = shm
+        return index, meta
+
+    def detach(self):
+        """
+        Drops the views of the shared memory block and closes it, the index
+        can't be used afterwards.
+        """
+        shm = self.__dict__.pop("_shm", None)
+        if shm is not None:
+            for k in self._arrays:
+                setattr(self, k, None)
+            shm.close()
+
+    @classmethod
+    def _frommask(cls, mask, startdate, weekdays):
+        """
+        Builds a fully loaded index from the holiday mask of the days
+        starting at `startdate`, the holidays are the masked days on
+        working weekdays.
+        """
+        index = cls.__new__(cls)
+        index.extend = False
+        index.startdate = startdate
+        index.enddate = startdate + timedelta(len(mask) - 1)
+        index.weekdays = weekdays
+        index._start = _ordinal(startdate)
+        index._end = index._start + len(mask) - 1
+        days = np.arange(index._start, index._end + 1, dtype=np.int64)
+        nonwork = np.zeros(7, dtype=bool)
+        nonwork[list(weekdays)] = True
+        index._holidays = days[mask & ~nonwork[_weekday(days)]]
+        index._effholidays = index._holidays
+        index._initchunks()
+        index._holmask = mask
+        index._fwd = np.cumsum(~mask, dtype=np.int32)
+        index._bwd = index._fwd + mask
+        months = days.astype("datetime64[D]").astype("datetime64[M]")
+        index._months = months.view(np.int64).astype(np.int32)
+        index._bizdays = days[~mask].astype("datetime64[D]")
+        index._loaded = [True] * len(index._loaded)
+        index._nloaded = len(index._loaded)
+        return index
+
+    def _loadchunk(self, c):
+        # threads sharing the index may ask for the same chunk at once, it's
+        # filled once and flagged as loaded only after its arrays are written
+        with self._loadlock:
+            if self._loaded[c]:
+                return
+            a, b = self._chunks[c], self._chunks[c + 1]
+            days = np.arange(a, b, dtype=np.int64)
+            mask = np.isin(_weekday(days), list(self.weekdays))
+            hol = self._effholidays
+            hol = hol[np.searchsorted(hol, a) : np.searchsorted(hol, b)]
+            mask[hol - a] = True
+            fwd = np.cumsum(~mask, dtype=np.int32) + (self._base[c] - self._k0)
+            p1, p2 = a - self._start, b - self._start
+            self._holmask[p1:p2] = mask
+            self._fwd[p1:p2] = fwd
+            self._bwd[p1:p2] = fwd + mask
+            months = days.astype("datetime64[D]").astype("datetime64[M]")
+            self._months[p1:p2] = months.view(np.int64)
+            self._bizdays[self._base[c] : self._base[c + 1]] = days[~mask]
+            self._loaded[c] = True
+            self._nloaded += 1
+
+    def _load(self, o1, o2):
+        # loads the chunks of the days between the ordinals o1 and o2
+        if self._nloaded == len(self._loaded):
+            return
+        c1 = bisect_right(self._chunks, o1) - 1
+        c2 = bisect_right(self._chunks, o2) - 1
+        for c in range(c1, c2 + 1):
+            if not self._loaded[c]:
+                self._loadchunk(c)
+
+    def _loadbizdays(self, k1, k2):
+        # loads the chunks of the k1-th to the k2-th business days
+        if self._nloaded == len(self._loaded):
+            return
+        c1 = bisect_left(self._base, k1) - 1
+        c2 = bisect_left(self._base, k2) - 1
+        for c in range(c1, c2 + 1):
+            if not self._loaded[c]:
+                self._loadchunk(c)
+
+    def _rebuild(self, startdate, enddate):
+        a = _ordinal(startdate)
+        b = self._start - 1
+        if a <= b:
+            hol = self._holidays
+            hol = hol[np.searchsorted(hol, a) : np.searchsorted(hol, b, "right")]
+            nhol = np.count_nonzero(~np.isin(_weekday(hol), list(self.weekdays)))
+            self._k0 += int(b - a + 1 - _countweekdays(a, b, self.weekdays) - nhol)
+        loaded = [
+            (self._chunks[c], self._chunks[c + 1] - 1)
+            for c, ok in enumerate(self._loaded)
+            if ok
+        ]
+        self.__init__(self._holidays, startdate, enddate, self.weekdays, self.extend)
+        # callers may have checked dates before the extension
+        for o1, o2 in loaded:
+            self._load(o1, o2)
+
+    def _check(self, o):
+        if o < self._start or o > self._end:
+            self._extend(_fromordinal(o), _fromordinal(o))
+        if self._nloaded < len(self._loaded):
+            c = bisect_right(self._chunks, o) - 1
+            if not self._loaded[c]:
+                self._loadchunk(c)
+        return o
+
+    def _maskrange(self, o1, o2):
+        self._load(o1, o2)
+        return self._holmask[o1 - self._start : o2 - self._start + 1]
+
+    def _checkarray(self, ords):
+        if len(ords):
+            o1, o2 = int(ords.min()), int(ords.max())
+            if o1 < self._start or o2 > self._end:
+                self._extend(_fromordinal(o1), _fromordinal(o2))
+            self._load(o1, o2)
+        return ords
+
+    def _ishol(self, o):
+        return self._holmask[o - self._start]
+
+    def _fwdcount(self, o):
+        return self._fwd[o - self._start]
+
+    def _monthof(self, o):
+        return self._months[o - self._start]
+
+    def _bwdcount(self, o):
+        return self._bwd[o - self._start]
+
+    def _counts(self, o):
+        # forward and backward counts and holiday flag of a scalar ordinal
+        p = o - self._start
+        return self._fwd.item(p), self._bwd.item(p), self._holmask.item(p)
+
+    def _bizday(self, k):
+        while not 0 < k + self._k0 <= len(self._bizdays):
+            self._extendbizdays(k + self._k0, k + self._k0)
+        p = k + self._k0
+        if self._nloaded < len(self._loaded):
+            c = bisect_left(self._base, p) - 1
+            if not self._loaded[c]:
+                self._loadchunk(c)
+        return self._bizdays.item(p - 1).toordinal() - EPOCH
+
+    def _bizdayarray(self, k):
+        if len(k):
+            k1, k2 = int(k.min()), int(k.max())
+            while k1 + self._k0 < 1 or k2 + self._k0 > len(self._bizdays):
+                self._extendbizdays(k1 + self._k0, k2 + self._k0)
+            self._loadbizdays(k1 + self._k0, k2 + self._k0)
+        return self._bizdays.view(np.int64)[k + (self._k0 - 1)]
+
+    def _span(self, year, month=None):
+        if month:
+            dt1 = date(year, month, 1)
+            dt2 = date(year + month // 12, month % 12 + 1, 1)
+        else:
+            dt1 = date(year, 1, 1)
+            dt2 = date(year + 1, 1, 1)
+        a = max(_ordinal(dt1), self._start)
+        b = min(_ordinal(dt2) - 1, self._end)
+        if a > b:
+            raise KeyError(year)
+        self._load(a, b)
+        return a, b
+
+    def _pos(self, o):
+        self._check(o)
+        return (o, int(self._fwdcount(o)), _fromordinal(o), int(self._bwdcount(o)))
+
+    def offset(self, dt, n):
+        o = self._check(_ordinal(dt))
+        if n > 0:
+            k = self._counts(o)[0] + n
+        elif n < 0:
+            k = self._counts(o)[1] + n
+        else:
+            return _fromordinal(o)
+        return _fromordinal(self._bizday(k))
+
+    def _following(self, o):
+        return self._bizday(self._counts(o)[1])
+
+    def _preceding(self, o):
+        return self._bizday(self._counts(o)[0])
+
+    def following(self, dt):
+        o = self._check(_ordinal(dt))
+        return _fromordinal(self._following(o))
+
+    def modified_following(self, dt):
+        o = self._check(_ordinal(dt))
+        dt = _fromordinal(o)
+        dtx = _fromordinal(self._following(o))
+        if (dtx.year, dtx.month) != (dt.year, dt.month):
+            dtx = _fromordinal(self._preceding(o))
+        return dtx
+
+    def preceding(self, dt):
+        o = self._check(_ordinal(dt))
+        return _fromordinal(self._preceding(o))
+
+    def modified_preceding(self, dt):
+        o = self._check(_ordinal(dt))
+        dt = _fromordinal(o)
+        dtx = _fromordinal(self._preceding(o))
+        if (dtx.year, dtx.month) != (dt.year, dt.month):
+            dtx = _fromordinal(self._following(o))
+        return dtx
+
+    def seq(self, dt1, dt2):
+        return self._seqarray(
+            self._check(_ordinal(dt1)), self._check(_ordinal(dt2))
+        ).tolist()
+
+    def _seqarray(self, o1, o2):
+        # business days between the checked ordinals, as datetime64[D]
+        p1 = int(self._bwdcount(o1)) + self._k0
+        p2 = int(self._fwdcount(o2)) + self._k0
+        self._loadbizdays(p1, p2)
+        return self._bizdays[p1 - 1 : p2]
+
+    def get(self, dt):
+        o = self._check(_ordinal(dt))
+        pos = o - self._start
+        return [
+            int(self._fwd[pos]),
+            pos + 1,
+            bool(self._holmask[pos]),
+            int(self._bwd[pos]),
+        ]
+
+    def getbizdays(self, year, month=None):
+        self._coveryear(year)
+        a, b = self._span(year, month)
+        return int(self._fwdcount(b) - self._bwdcount(a) + 1)
+
+    def _nthday(self, n, year, month=None):
+        # ordinals of the n-th day, business day and weekday of the span
+        a, b = self._span(year, month)
+        return a + _nthindex(n, b - a + 1)
+
+    def _nthbizday(self, n, year, month=None):
+        a, b = self._span(year, month)
+        k1 = int(self._bwdcount(a))
+        k2 = int(self._fwdcount(b))
+        k = k1 + _nthindex(n, k2 - k1 + 1)
+        return int(self._bizday(k))
+
+    def _nthweekday(self, n, weekday, year, month=None):
+        a, b = self._span(year, month)
+        first = a + (self.WEEKDAYS.index(weekday) - _weekday(a)) % 7
+        size = (b - first) // 7 + 1 if first <= b else 0
+        return first + 7 * _nthindex(n, size)
+
+    def _getnthdaypos(self, n, year, month=None):
+        return self._pos(self._nthday(n, year, month))
+
+    def _getnthbizdaypos(self, n, year, month=None):
+        return self._pos(self._nthbizday(n, year, month))
+
+    def _getnthweekdaypos(self, n, weekday, year, month=None):
+        return self._pos(self._nthweekday(n, weekday, year, month))
+
+    def _getnthday_beforeafter(self, n1, pos):
+        return _fromordinal(self._check(pos[0] + n1))
+
+    def _getnthbizday_beforeafter(self, n1, pos):
+        k = pos[1] + n1 if n1 > 0 else pos[3] + n1
+        return _fromordinal(self._bizday(k))
+
+    def _getnthweekday_beforeafter(self, n1, weekday, pos):
+        o = pos[0]
+        delta = (_weekday(o) - self.WEEKDAYS.index(weekday)) % 7
+        if delta and n1 < 0:
+            n1 = n1 + 1
+        return _fromordinal(self._check(o - delta + 7 * n1))
+
+    def _getnthday(self, n, year, month=None):
+        return _fromordinal(self._nthday(n, year, month))
+
+    def _getnthbizday(self, n, year, month=None):
+        return _fromordinal(self._nthbizday(n, year, month))
+
+    def _getnthweekday(self, n, weekday, year, month=None):
+        return _fromordinal(self._nthweekday(n, weekday, year, month))
+
+
+class WeekdayIndex(ArrayDateIndex):
+    """
+    Date index for calendars without holidays.
+
+    Business days repeat weekly, so the counts are computed from the
+    number of nonworking weekdays since 1970-01-01 and the k-th business
+    day from the position of the working weekdays within a week. Nothing is
+    stored per day: construction is immediate, memory is constant and
+    extending the range costs nothing.
+    """
+
+    def __init__(self, holidays, startdate, enddate, weekdays, extend=False):
+        self.extend = extend
+        self.startdate = Date(startdate).date
+        self.enddate = Date(enddate).date
+        self.weekdays = weekdays
+        self._start = _ordinal(self.startdate)
+        self._end = _ordinal(self.enddate)
+        self._holidays = np.empty(0, dtype=np.int64)
+        self._nonwork = np.zeros(7, dtype=bool)
+        self._nonwork[list(weekdays)] = True
+        # ordinals of the working weekdays in the week starting at 1970-01-01
+        self._workdays = np.flatnonzero(~self._nonwork[_weekday(np.arange(7))])
+        if len(self._workdays) == 0:
+            raise ValueError("Calendar without working weekdays")
+
+    def __get_nbytes(self):
+        return self._nonwork.nbytes + self._workdays.nbytes
+
+    nbytes = property(__get_nbytes)
+
+    def _rebuild(self, startdate, enddate):
+        self.startdate = startdate
+        self.enddate = enddate
+        self._start = _ordinal(startdate)
+        self._end = _ordinal(enddate)
+
+    def _check(self, o):
+        if o < self._start or o > self._end:
+            self._extend(_fromordinal(o), _fromordinal(o))
+        return o
+
+    def _checkarray(self, ords):
+        if len(ords):
+            o1, o2 = int(ords.min()), int(ords.max())
+            if o1 < self._start or o2 > self._end:
+                self._extend(_fromordinal(o1), _fromordinal(o2))
+        return ords
+
+    def _load(self, o1, o2):
+        pass
+
+    def _maskrange(self, o1, o2):
+        return self._nonwork[_weekday(np.arange(o1, o2 + 1))]
+
+    def _ishol(self, o):
+        return self._nonwork[_weekday(o)]
+
+    def _fwdcount(self, o):
+        return o + 1 - _countweekdays(0, o, self.weekdays)
+
+    def _bwdcount(self, o):
+        return self._fwdcount(o) + self._ishol(o)
+
+    def _counts(self, o):
+        fwd = int(self._fwdcount(o))
+        hol = bool(self._ishol(o))
+        return fwd, fwd + hol, hol
+
+    def _monthof(self, o):
+        if _isndarray(o):
+            return o.astype("datetime64[D]").astype("datetime64[M]").view(np.int64)
+        dt = _fromordinal(o)
+        return (dt.year - 1970) * 12 + dt.month - 1
+
+    def _workday(self, k):
+        # the k-th working weekday
+        q, r = divmod(k - 1, len(self._workdays))
+        return 7 * q + int(self._workdays[r])
+
+    def _workdayarray(self, k):
+        q, r = np.divmod(k - 1, len(self._workdays))
+        return 7 * q + self._workdays[r]
+
+    def _bizday(self, k):
+        return self._check(self._workday(int(k)))
+
+    def _bizdayarray(self, k):
+        return self._checkarray(self._workdayarray(k))
+
+    def _seqarray(self, o1, o2):
+        k = np.arange(self._bwdcount(o1), self._fwdcount(o2) + 1)
+        return self._bizdayarray(k).astype("datetime64[D]")
+
+    def get(self, dt):
+        o = self._check(_ordinal(dt))
+        return [
+            int(self._fwdcount(o)),
+            o - self._start + 1,
+            bool(self._ishol(o)),
+            int(self._bwdcount(o)),
+        ]
+
+    def update(self, dates, add=True):
+        """
+        Returns a new index with the given dates added to or removed from
+        the holidays, adding holidays requires an array index.
+        """
+        cls = ArrayDateIndex if add and len(dates) else type(self)
+        index = cls(
+            dates if add else [],
+            self.startdate,
+            self.enddate,
+            self.weekdays,
+            self.extend,
+        )
+        index.name = self.name
+        return index
+
+
+class BisectIndex(WeekdayIndex):
+    """
+    Date index that stores only the sorted holidays.
+
+    Counts are the weekday counts of `WeekdayIndex` minus the holidays
+    found by binary search, the k-th business day is the weekday estimate
+    corrected by the holidays before it until it settles. Memory is
+    proportional to the number of holidays and the range is extended for
+    free.
+    """
+
+    def __init__(self, holidays, startdate, enddate, weekdays, extend=False):
+        super().__init__([], startdate, enddate, weekdays, extend)
+        hol = _asordinals(holidays, ordinals=True)[0].astype(np.int64)
+        if hol.size > 1 and not (hol[1:] > hol[:-1]).all():
+            hol = np.unique(hol)
+        self._holidays = hol
+        # holidays on nonworking weekdays don't change the counts
+        self._effholidays = hol[~self._nonwork[_weekday(hol)]]
+        # for the scalar searches, bisect on a list is faster
+        self._efflist = self._effholidays.tolist()
+
+    def __get_nbytes(self):
+        return (
+            self._holidays.nbytes
+            + self._effholidays.nbytes
+            + sys.getsizeof(self._efflist)
+            + self._nonwork.nbytes
+            + self._workdays.nbytes
+        )
+
+    nbytes = property(__get_nbytes)
+
+    def _maskrange(self, o1, o2):
+        return _weekdaymask(o1, o2, self.weekdays, self._effholidays)
+
+    def _isholiday(self, o, i):
+        # i is the number of holidays up to o
+        hol = self._effholidays
+        if len(hol) == 0:
+            return i > 0
+        return (i > 0) & (hol[np.maximum(i - 1, 0)] == o)
+
+    def _ishol(self, o):
+        i = self._effholidays.searchsorted(o, "right")
+        return self._nonwork[_weekday(o)] | self._isholiday(o, i)
+
+    def _fwdcount(self, o):
+        nhol = self._effholidays.searchsorted(o, "right")
+        return o + 1 - _countweekdays(0, o, self.weekdays) - nhol
+
+    def _bwdcount(self, o):
+        i = self._effholidays.searchsorted(o, "right")
+        ishol = self._nonwork[_weekday(o)] | self._isholiday(o, i)
+        return o + 1 - _countweekdays(0, o, self.weekdays) - i + ishol
+
+    def _bizday(self, k):
+        # the k-th working weekday skipping the holidays before it, the
+        # estimate only moves forward and stops at the answer
+        k = int(k)
+        o = self._workday(k)
+        while True:
+            o2 = self._workday(k + bisect_right(self._efflist, o))
+            if o2 == o:
+                return self._check(o)
+            o = o2
+
+    def _bizdayarray(self, k):
+        o = self._workdayarray(k)
+        while True:
+            nhol = self._effholidays.searchsorted(o, "right")
+            o2 = self._workdayarray(k + nhol)
+            if (o2 == o).all():
+                return self._checkarray(o)
+            o = o2
+
+    def update(self, dates, add=True):
+        """
+        Returns a new index with the given dates added to or removed from
+        the holidays.
+        """
+        ords = np.unique(_asordinals(dates)[0]).astype(np.int64)
+        if add:
+            holidays = np.union1d(self._holidays, ords)
+        else:
+            holidays = np.setdiff1d(self._holidays, ords, assume_unique=True)
+        index = type(self)(
+            holidays, self.startdate, self.enddate, self.weekdays, self.extend
+        )
+        index.name = self.name
+        return index
+
+
+ENGINES = {
+    "dict": DateIndex,
+    "array": ArrayDateIndex,
+    "weekday": WeekdayIndex,
+    "bisect": BisectIndex,
+}
+
 
 class Date(object):
     def __init__(self, d=None, format="%Y-%m-%d"):
@@ -454,6 +1622,8 @@ class Date(object):
             d = d.date
         elif isinstance(d, date):
             pass
+        elif "numpy" in sys.modules and isinstance(d, np.datetime64):
+            d = d.astype("datetime64[D]").item()
         elif d is None:
             pass
         else:
@@ -529,6 +1699,31 @@ class Calendar(object):
 
     financial : bool
         Defines a financial calendar
+
+    engine : str
+        Date index engine: ``"array"`` stores the index in NumPy arrays
+        (default when NumPy is installed), ``"weekday"`` computes business
+        days from the weekdays, with no index, and is the default for
+        calendars without holidays, ``"bisect"`` keeps only the sorted
+        holidays and searches them, using much less memory than
+        ``"array"`` at the cost of speed, and ``"dict"`` uses a pure Python
+        index.
+
+    extend : bool
+        Extend the calendar's range, in whole years, when dates out of it
+        are used instead of raising ``DateOutOfRange``. Dates out of the
+        original range are business days unless they fall on nonworking
+        weekdays or listed holidays. Extensions are logged to the
+        ``bizdays`` logger.
+
+    Notes
+    -----
+    The ``errors`` argument of the methods sets how dates out of the
+    calendar's range are handled in sequences: ``"raise"`` (default) raises
+    ``DateOutOfRange``, ``"coerce"`` returns them as nulls and ``"clip"``
+    moves them to the range's bounds. The range is checked once per call and
+    the number of dates coerced or clipped is logged to the ``bizdays``
+    logger. ``"coerce"`` and ``"clip"`` require an array-based engine.
     """
 
     _weekdays = (
@@ -540,6 +1735,10 @@ class Calendar(object):
         "Saturday",
         "Sunday",
     )
+    _weekdays_set = frozenset(wd.lower() for wd in _weekdays)
+    _date_re = re.compile(r"^\d\d\d\d-\d\d-\d\d$")
+    # sections of multi-calendar files start with [name] lines
+    _section_re = re.compile(r"^[ \t]*\[([^\]\n]*)\][ \t]*$", re.M)
 
     def __init__(
         self,
@@ -549,23 +1748,34 @@ class Calendar(object):
         enddate=None,
         name=None,
         financial=True,
+        engine=None,
+        extend=False,
     ):
         self.financial = financial
         self.name = name
-        self._holidays = [Date(d) for d in holidays]
+        if _isndarray(holidays):
+            holidays = holidays.astype("datetime64[D]")
+            self.__holidays = None
+            self.__holidays_array = holidays
+            limits = (holidays.min(), holidays.max()) if len(holidays) else None
+        else:
+            holidays = self.__holidays = [Date(d) for d in holidays]
+            self.__holidays_array = None
+            limits = (min(holidays), max(holidays)) if len(holidays) else None
+        self.__nholidays = len(holidays)
         self._nonwork_weekdays = [
             [w[:3].lower() for w in self._weekdays].index(wd[:3].lower())
             for wd in weekdays
         ]
-        if len(self._holidays):
+        if limits:
             if startdate:
                 self._startdate = Date(startdate)
             else:
-                self._startdate = min(self._holidays)
+                self._startdate = Date(limits[0])
             if enddate:
                 self._enddate = Date(enddate)
             else:
-                self._enddate = max(self._holidays)
+                self._enddate = Date(limits[1])
         else:
             if startdate:
                 self._startdate = Date(startdate)
@@ -575,32 +1785,69 @@ class Calendar(object):
                 self._enddate = Date(enddate)
             else:
                 self._enddate = Date("2071-01-01")
-        self._index = DateIndex(
-            self._holidays, self._startdate, self._enddate, self._nonwork_weekdays
+        if engine is None:
+            if not NUMPY_INSTALLED:
+                engine = "dict"
+            elif self.__nholidays == 0 and len(set(self._nonwork_weekdays)) < 7:
+                engine = "weekday"
+            else:
+                engine = "array"
+        if engine not in ENGINES:
+            raise ValueError("Invalid engine: %s" % engine)
+        self.engine = engine
+        self._index = ENGINES[engine](
+            holidays, self._startdate, self._enddate, self._nonwork_weekdays, extend
         )
+        self._index.name = name
         self.vec = VectorizedOps(self)
 
+    # set on calendars shared by the registry, their public attributes
+    # can't be set, private ones hold lazily built values
+    _readonly = False
+
+    def __setattr__(self, name, value):
+        if self._readonly and not name.startswith("_"):
+            raise AttributeError(
+                "Calendar %s is shared by the registry and is read-only" % self.name
+            )
+        object.__setattr__(self, name, value)
+
     def __get_weekdays(self):
         return tuple(self._weekdays[nwd] for nwd in self._nonwork_weekdays)
 
     weekdays = property(__get_weekdays)
 
     def __get_startdate(self):
-        return self._startdate.date
+        return self._index.startdate
 
     startdate = property(__get_startdate)
 
     def __get_enddate(self):
-        return self._enddate.date
+        return self._index.enddate
 
     enddate = property(__get_enddate)
 
-    def __get_holidays(self):
-        return [d.date for d in self._holidays]
+    def __get_extend(self):
+        return self._index.extend
+
+    def __set_extend(self, extend):
+        self._index.extend = extend
+
+    extend = property(__get_extend, __set_extend)
+
+    def __get_holidays_list(self):
+        if self.__holidays is None:
+            self.__holidays = [Date(d) for d in self.__holidays_array.tolist()]
+        return self.__holidays
+
+    _holidays = property(__get_holidays_list)
+
+    def __get_holidays(self):
+        return [d.date for d in self._holidays]
 
     holidays = property(__get_holidays)
 
-    def bizdays(self, date_from, date_to):
+    def bizdays(self, date_from, date_to, format=None, errors="raise"):
         """
         Calculate the amount of business days between two dates
 
@@ -613,35 +1860,58 @@ class Calendar(object):
         date_to : datetime.date, datetime.datetime, pandas.Timestamp, str
             End date
 
+        format : str
+            Format of the dates given as strings, like ``"%d/%m/%Y"``,
+            ISO dates are expected by default.
+
+        errors : str
+            How dates out of the range are handled in sequences, ``"raise"``
+            (default), ``"coerce"`` or ``"clip"``, see :class:`Calendar`.
+
         Returns
         -------
         int, list, numpy.ndarray
             The number of business days between date_from and date_to
         """
+        _checkerrors(errors)
         if isseq(date_from) or isseq(date_to):
-            return recseq(self.vec.bizdays(date_from, date_to), "array")
+            bdays = self.vec.bizdays_array(date_from, date_to, format, errors)
+            if bdays is None:
+                bdays = self.vec.bizdays(date_from, date_to, format)
+            return recseq(bdays, "array")
         else:
             if isnull(date_from) or isnull(date_to):
                 return return_none()
-            date_from = Date(date_from).date
-            date_to = Date(date_to).date
-            if date_from > date_to:
-                d1, d2 = date_to, date_from
+            date_from = _strpdate(date_from, format)
+            date_to = _strpdate(date_to, format)
+            ix = self._index
+            if ix.vectorized:
+                # one conversion and one range check per date
+                o_from = ix._check(_ordinal(date_from))
+                o_to = ix._check(_ordinal(date_to))
+                date_reverse = o_from > o_to
+                if date_reverse:
+                    o_from, o_to = o_to, o_from
+                t1 = ix._counts(o_from)
+                t2 = ix._counts(o_to)
             else:
-                d1, d2 = date_from, date_to
-            t1 = (self._index[d1][0], self._index[d1][3])
-            t2 = (self._index[d2][0], self._index[d2][3])
+                date_from = _todate(date_from)
+                date_to = _todate(date_to)
+                date_reverse = date_from > date_to
+                ix1 = ix[min(date_from, date_to)]
+                ix2 = ix[max(date_from, date_to)]
+                t1 = (ix1[0], ix1[3], ix1[2])
+                t2 = (ix2[0], ix2[3], ix2[2])
             i1 = t2[0] - t1[0]
             i2 = t2[1] - t1[1]
             bdays = min(i1, i2)
-            adj_vec = int(self._index[d1][2] and self._index[d2][2])
-            date_reverse = date_from > date_to
+            adj_vec = int(t1[2] and t2[2])
             if date_reverse:
                 adj_vec = -adj_vec
                 bdays = -bdays
             bdays -= adj_vec
             if self.financial:
-                if self._index[d1][2] and self._index[d2][2] and abs(bdays) == 1:
+                if t1[2] and t2[2] and abs(bdays) == 1:
                     return 0
                 else:
                     return bdays
@@ -651,7 +1921,7 @@ class Calendar(object):
                 else:
                     return bdays + 1
 
-    def isbizday(self, dt):
+    def isbizday(self, dt, format=None, errors="raise"):
         """
         Checks if the given dates are business days.
 
@@ -661,6 +1931,14 @@ class Calendar(object):
         dt : datetime.date, datetime.datetime, pandas.Timestamp, str
             Dates to be checked
 
+        format : str
+            Format of the dates given as strings, like ``"%d/%m/%Y"``,
+            ISO dates are expected by default.
+
+        errors : str
+            How dates out of the range are handled in sequences, ``"raise"``
+            (default), ``"coerce"`` or ``"clip"``, see :class:`Calendar`.
+
         Returns
         -------
 
@@ -668,18 +1946,25 @@ class Calendar(object):
             Returns True if the given date is a business day and False
             otherwise.
         """
+        _checkerrors(errors)
         if isseq(dt):
-            return recseq(self.vec.isbizday(dt), "array")
+            bizdays = self.vec.isbizday_array(dt, format, errors)
+            if bizdays is None:
+                bizdays = self.vec.isbizday(dt, format)
+            return recseq(bizdays, "array")
         else:
             if isnull(dt):
                 return dt
-            else:
-                return not self._index[dt][2]
+            dt = _strpdate(dt, format)
+            ix = self._index
+            if ix.vectorized:
+                return not ix._ishol(ix._check(_ordinal(dt)))
+            return not ix[dt][2]
 
     def __adjust_next(self, dt):
-        return Date(self._index.following(dt)).date
+        return self._index.following(dt)
 
-    def adjust_next(self, dt):
+    def adjust_next(self, dt, format=None, errors="raise"):
         """
         Adjusts the given dates to the next business day
 
@@ -692,6 +1977,14 @@ class Calendar(object):
         dt : datetime.date, datetime.datetime, pandas.Timestamp, str
             Dates to be adjusted
 
+        format : str
+            Format of the dates given as strings, like ``"%d/%m/%Y"``,
+            ISO dates are expected by default.
+
+        errors : str
+            How dates out of the range are handled in sequences, ``"raise"``
+            (default), ``"coerce"`` or ``"clip"``, see :class:`Calendar`.
+
         Returns
         -------
 
@@ -700,16 +1993,20 @@ class Calendar(object):
             not a business day.
 
         """
+        _checkerrors(errors)
         if isseq(dt):
-            return recseq(self.vec.adjust_next(dt))
+            dts = self.vec.adjust_array(dt, "following", format, errors)
+            if dts is None:
+                dts = self.vec.adjust_next(dt, format)
+            return recseq(dts)
         else:
             if isnull(dt):
                 return dt
-            return retdate(self.__adjust_next(dt))
+            return retdate(self.__adjust_next(_strpdate(dt, format)))
 
     following = adjust_next
 
-    def modified_following(self, dt):
+    def modified_following(self, dt, format=None, errors="raise"):
         """
         Adjusts the given dates to the next business day with a small
         difference.
@@ -724,6 +2021,14 @@ class Calendar(object):
         dt : datetime.date, datetime.datetime, pandas.Timestamp, str
             Dates to be adjusted
 
+        format : str
+            Format of the dates given as strings, like ``"%d/%m/%Y"``,
+            ISO dates are expected by default.
+
+        errors : str
+            How dates out of the range are handled in sequences, ``"raise"``
+            (default), ``"coerce"`` or ``"clip"``, see :class:`Calendar`.
+
         Returns
         -------
 
@@ -732,18 +2037,22 @@ class Calendar(object):
             not a business day.
 
         """
+        _checkerrors(errors)
         if isseq(dt):
-            return recseq(self.vec.modified_following(dt))
+            dts = self.vec.adjust_array(dt, "modified_following", format, errors)
+            if dts is None:
+                dts = self.vec.modified_following(dt, format)
+            return recseq(dts)
         else:
             if isnull(dt):
                 return dt
-            dtx = self._index.modified_following(dt)
+            dtx = self._index.modified_following(_strpdate(dt, format))
             return retdate(dtx)
 
     def __adjust_previous(self, dt):
-        return Date(self._index.preceding(dt)).date
+        return self._index.preceding(dt)
 
-    def adjust_previous(self, dt):
+    def adjust_previous(self, dt, format=None, errors="raise"):
         """
         Adjusts the given dates to the previous business day
 
@@ -756,6 +2065,14 @@ class Calendar(object):
         dt : datetime.date, datetime.datetime, pandas.Timestamp, str
             Dates to be adjusted
 
+        format : str
+            Format of the dates given as strings, like ``"%d/%m/%Y"``,
+            ISO dates are expected by default.
+
+        errors : str
+            How dates out of the range are handled in sequences, ``"raise"``
+            (default), ``"coerce"`` or ``"clip"``, see :class:`Calendar`.
+
         Returns
         -------
 
@@ -764,17 +2081,21 @@ class Calendar(object):
             not a business day.
 
         """
+        _checkerrors(errors)
         if isseq(dt):
-            return recseq(self.vec.adjust_previous(dt))
+            dts = self.vec.adjust_array(dt, "preceding", format, errors)
+            if dts is None:
+                dts = self.vec.adjust_previous(dt, format)
+            return recseq(dts)
         else:
             if isnull(dt):
                 return dt
-            dt = self.__adjust_previous(dt)
+            dt = self.__adjust_previous(_strpdate(dt, format))
             return retdate(dt)
 
     preceding = adjust_previous
 
-    def modified_preceding(self, dt):
+    def modified_preceding(self, dt, format=None, errors="raise"):
         """
         Adjusts the given dates to the previous business day with a small
         difference.
@@ -789,6 +2110,14 @@ class Calendar(object):
         dt : datetime.date, datetime.datetime, pandas.Timestamp, str
             Dates to be adjusted
 
+        format : str
+            Format of the dates given as strings, like ``"%d/%m/%Y"``,
+            ISO dates are expected by default.
+
+        errors : str
+            How dates out of the range are handled in sequences, ``"raise"``
+            (default), ``"coerce"`` or ``"clip"``, see :class:`Calendar`.
+
         Returns
         -------
 
@@ -797,12 +2126,16 @@ class Calendar(object):
             not a business day.
 
         """
+        _checkerrors(errors)
         if isseq(dt):
-            return recseq(self.vec.modified_preceding(dt))
+            dts = self.vec.adjust_array(dt, "modified_preceding", format, errors)
+            if dts is None:
+                dts = self.vec.modified_preceding(dt, format)
+            return recseq(dts)
         else:
             if isnull(dt):
                 return dt
-            dtx = self._index.modified_preceding(dt)
+            dtx = self._index.modified_preceding(_strpdate(dt, format))
             return retdate(dtx)
 
     def seq(self, date_from, date_to):
@@ -829,12 +2162,16 @@ class Calendar(object):
         if _from > _to:
             _from, _to = _to, _from
             reverse = True
-        _seq = recseq(retdate(dt) for dt in self._index.seq(_from, _to))
+        ix = self._index
+        if ix.vectorized:
+            dts = ix._seqarray(ix._check(_ordinal(_from)), ix._check(_ordinal(_to)))
+            return recseq(dts[::-1] if reverse else dts)
+        _seq = recseq(retdate(dt) for dt in ix.seq(_from, _to))
         if reverse:
             _seq.reverse()
         return _seq
 
-    def offset(self, dt, n):
+    def offset(self, dt, n, format=None, errors="raise"):
         """
         Offsets the given dates by n business days.
 
@@ -847,6 +2184,14 @@ class Calendar(object):
         n : int, list of int
             the amount of business days to offset
 
+        format : str
+            Format of the dates given as strings, like ``"%d/%m/%Y"``,
+            ISO dates are expected by default.
+
+        errors : str
+            How dates out of the range are handled in sequences, ``"raise"``
+            (default), ``"coerce"`` or ``"clip"``, see :class:`Calendar`.
+
         Returns
         -------
         date, list of dates, pandas.DatetimeIndex
@@ -854,14 +2199,18 @@ class Calendar(object):
             days.
 
         """
+        _checkerrors(errors)
         if isseq(dt) or isseq(n):
-            return recseq(self.vec.offset(dt, n))
+            dts = self.vec.offset_array(dt, n, format, errors)
+            if dts is None:
+                dts = self.vec.offset(dt, n, format)
+            return recseq(dts)
         else:
             if isnull(dt):
                 return dt
             elif isnull(n):
                 return n
-            return retdate(self._index.offset(dt, n))
+            return retdate(self._index.offset(_strpdate(dt, format), n))
 
     def diff(self, dts):
         """
@@ -898,8 +2247,9 @@ class Calendar(object):
         Parameters
         ----------
 
-        expr : str, list of str
-            String specifying the date to be returned.
+        expr : str, list of str, GetdatePlan
+            String specifying the date to be returned, or an expression
+            compiled with :func:`compile_getdate`.
 
             See :doc:`getdate` for more information.
 
@@ -920,7 +2270,7 @@ class Calendar(object):
             return recseq(self.vec.getdate(expr, year, month))
         else:
             dt = self._index.getdate(expr, year, month)
-            return retdate(Date(dt).date)
+            return retdate(_todate(dt))
 
     def getbizdays(self, year, month=None):
         """
@@ -980,33 +2330,393 @@ class Calendar(object):
             return cls._load_calendar_from_file(res)
         elif name:
             if name.startswith("PMC/"):
-                try:
-                    import pandas_market_calendars as mcal
-                except ImportError:
-                    raise Exception("pandas_market_calendars must be installed to use PMC calendars")
-                cal = mcal.get_calendar(name[4:])
-                hol = cal.holidays()
-                return Calendar((d.item() for d in hol.holidays), weekdays=("Saturday", "Sunday"), name=name)
+                return cls._load_pmc_calendar(name)
             else:
                 res = _checklocalfile(name)
                 return cls._load_calendar_from_file(res)
 
+    @classmethod
+    def load_all(cls, filename):
+        """
+        Load all calendars from a file.
+
+        Files have sections starting with a line with the calendar's name
+        in square brackets followed by its weekdays and holidays, like a
+        calendar file::
+
+            [B3]
+            Saturday
+            Sunday
+            2024-01-01
+            ...
+
+        A file without sections has a single calendar named after the
+        file. Files can be gzip compressed.
+
+        Parameters
+        ----------
+
+        filename : str
+            Text file with the calendars.
+
+        Returns
+        -------
+        dict
+            Calendar objects by name, in the order of the file.
+        """
+        res = _checkfile(filename)
+        with res["iter"] as fcal:
+            text = fcal.read()
+        sections = cls._parse_calendars(text, res["name"])
+        holidays = cls._parse_holidays([s[2] for s in sections])
+        return {
+            name: Calendar(hol, weekdays=weekdays, name=name)
+            for (name, weekdays, _), hol in zip(sections, holidays)
+        }
+
+    @classmethod
+    def _parse_calendars(cls, text, name=None):
+        # name, nonworking weekdays and holidays (ISO strings) of each
+        # section of the text
+        parts = cls._section_re.split(text)
+        if len(parts) == 1:
+            sections = [(name, text)]
+        else:
+            sections = [(n.strip(), body) for n, body in zip(parts[1::2], parts[2::2])]
+        res = []
+        for n, body in sections:
+            lines = [line.strip() for line in body.splitlines()]
+            # lines shaped as ISO dates are checked when they are parsed
+            dates = [line for line in lines if len(line) == 10 and line[4] == "-"]
+            weekdays = [
+                line
+                for line in lines
+                if line[:1].isalpha() and line.lower() in cls._weekdays_set
+            ]
+            res.append((n, weekdays, dates))
+        return res
+
+    @classmethod
+    def _parse_holidays(cls, holidays):
+        # parses the holidays of all sections in one call
+        if not NUMPY_INSTALLED:
+            return [[d for d in hol if cls._date_re.match(d)] for hol in holidays]
+        dates = [d for hol in holidays for d in hol]
+        try:
+            dates = np.array(dates, dtype="datetime64[D]")
+        except ValueError:
+            # lines that aren't dates are skipped
+            holidays = [[d for d in hol if cls._date_re.match(d)] for hol in holidays]
+            dates = np.array(
+                [d for hol in holidays for d in hol], dtype="datetime64[D]"
+            )
+        return np.split(dates, np.cumsum([len(hol) for hol in holidays])[:-1])
+
     @classmethod
     def _load_calendar_from_file(cls, res: Dict[str, TextIO]) -> "Calendar":
-        w = "|".join(w.lower() for w in cls._weekdays)
-        wre = "^%s$" % w
-        _holidays = []
-        _nonwork_weekdays = []
         with res["iter"] as fcal:
-            for cal_reg in fcal:
-                cal_reg = cal_reg.strip()
-                if cal_reg == "":
-                    continue
-                if re.match(wre, cal_reg.lower()):
-                    _nonwork_weekdays.append(cal_reg)
-                elif re.match(r"^\d\d\d\d-\d\d-\d\d$", cal_reg):
-                    _holidays.append(Date(cal_reg))
-        return Calendar(_holidays, weekdays=_nonwork_weekdays, name=res["name"])
+            text = fcal.read()
+        usecache = NUMPY_INSTALLED and get_option("cache")
+        if usecache:
+            key = hashlib.sha1(text.encode("utf-8")).hexdigest()
+            image = _readcache(key)
+            if image is not None:
+                _nonwork_weekdays = [cls._weekdays[wd] for wd in image[0]]
+                return Calendar(image[1], weekdays=_nonwork_weekdays, name=res["name"])
+        sections = cls._parse_calendars(text)
+        if len(sections) > 1:
+            raise Exception(
+                f"Multiple calendars in {res['name']}, use Calendar.load_all"
+            )
+        _, _nonwork_weekdays, _holidays = sections[0]
+        _holidays = cls._parse_holidays([_holidays])[0]
+        cal = Calendar(_holidays, weekdays=_nonwork_weekdays, name=res["name"])
+        if usecache:
+            _writecache(key, cal._nonwork_weekdays, _holidays)
+        return cal
+
+    @classmethod
+    def _load_pmc_calendar(cls, name):
+        # PMC calendars are cached by the package version and the calendar
+        # name, so pandas_market_calendars is only imported on a miss
+        from importlib import metadata
+
+        try:
+            version = metadata.version("pandas_market_calendars")
+        except metadata.PackageNotFoundError:
+            raise Exception(
+                "pandas_market_calendars must be installed to use PMC calendars"
+            )
+        weekdays = ("Saturday", "Sunday")
+        usecache = NUMPY_INSTALLED and get_option("cache")
+        if usecache:
+            key = hashlib.sha1(f"PMC {version} {name}".encode("utf-8")).hexdigest()
+            image = _readcache(key)
+            if image is not None:
+                return Calendar(image[1], weekdays=weekdays, name=name)
+        import pandas_market_calendars as mcal
+
+        hol = mcal.get_calendar(name[4:]).holidays().holidays
+        if NUMPY_INSTALLED:
+            hol = np.array(hol, dtype="datetime64[D]")
+        else:
+            hol = [d.item() for d in hol]
+        cal = Calendar(hol, weekdays=weekdays, name=name)
+        if usecache:
+            _writecache(key, cal._nonwork_weekdays, hol)
+        return cal
+
+    @classmethod
+    def _fromindex(cls, index, name=None, financial=True, holidays=None):
+        cal = cls.__new__(cls)
+        cal.financial = financial
+        cal.name = name
+        if holidays is None:
+            holidays = index._holidays.view("datetime64[D]")
+        if _isndarray(holidays):
+            cal.__holidays = None
+            cal.__holidays_array = holidays
+        else:
+            cal.__holidays = holidays
+            cal.__holidays_array = None
+        cal.__nholidays = len(holidays)
+        cal._nonwork_weekdays = list(index.weekdays)
+        cal._startdate = Date(index.startdate)
+        cal._enddate = Date(index.enddate)
+        cal.engine = {v: k for k, v in ENGINES.items()}[type(index)]
+        index.name = name
+        cal._index = index
+        cal.vec = VectorizedOps(cal)
+        return cal
+
+    def add_holidays(self, dates):
+        """
+        Create a calendar with additional holidays.
+
+        The calendar's index is patched instead of rebuilt and the new
+        calendar shares the unchanged parts of it. The calendar's range is
+        kept, holidays outside of it are stored but have no effect.
+
+        Parameters
+        ----------
+
+        dates : date or list of dates
+            Dates can be ISO formated string, datetime.date or
+            datetime.datetime.
+
+        Returns
+        -------
+        Calendar
+            A new Calendar object, this calendar is not modified.
+        """
+        return self.__update(dates, True)
+
+    def remove_holidays(self, dates):
+        """
+        Create a calendar without the given holidays.
+
+        The calendar's index is patched instead of rebuilt and the new
+        calendar shares the unchanged parts of it. Dates that aren't
+        holidays are ignored.
+
+        Parameters
+        ----------
+
+        dates : date or list of dates
+            Dates can be ISO formated string, datetime.date or
+            datetime.datetime.
+
+        Returns
+        -------
+        Calendar
+            A new Calendar object, this calendar is not modified.
+        """
+        return self.__update(dates, False)
+
+    def __update(self, dates, add):
+        if not isseq(dates):
+            dates = [dates]
+        dates = [Date(d) for d in dates]
+        index = self._index.update([d.date for d in dates], add)
+        if self.__holidays_array is not None:
+            # holidays given as an array are kept sorted and unique
+            if index.vectorized:
+                holidays = index._holidays.view("datetime64[D]")
+            else:
+                holidays = np.unique(np.array(index.holidays, dtype="datetime64[D]"))
+        else:
+            if add:
+                current = set(d.date for d in self._holidays)
+                holidays = self._holidays + [d for d in dates if d.date not in current]
+            else:
+                removed = set(d.date for d in dates)
+                holidays = [d for d in self._holidays if d.date not in removed]
+        return self._fromindex(index, self.name, self.financial, holidays)
+
+    def union(self, *others, name=None):
+        """
+        Create a calendar with the holidays of this and other calendars.
+
+        Business days of the new calendar are business days in every
+        calendar, like the settlement days of cross-border trades. The
+        calendar is built from the holiday masks of the calendars over the
+        range they have in common. Requires NumPy.
+
+        Parameters
+        ----------
+
+        others : Calendar
+            Calendars to join.
+
+        name : str
+            Name of the new calendar.
+
+        Returns
+        -------
+        Calendar
+            A new Calendar object.
+        """
+        return self.__join(others, name, np.logical_or)
+
+    def intersection(self, *others, name=None):
+        """
+        Create a calendar with the holidays shared by this and other
+        calendars.
+
+        Business days of the new calendar are business days in any of the
+        calendars. The calendar is built from the holiday masks of the
+        calendars over the range they have in common. Requires NumPy.
+
+        Parameters
+        ----------
+
+        others : Calendar
+            Calendars to join.
+
+        name : str
+            Name of the new calendar.
+
+        Returns
+        -------
+        Calendar
+            A new Calendar object.
+        """
+        return self.__join(others, name, np.logical_and)
+
+    def __join(self, others, name, op):
+        cals = (self,) + others
+        o1 = max(_ordinal(cal.startdate) for cal in cals)
+        o2 = min(_ordinal(cal.enddate) for cal in cals)
+        if o1 > o2:
+            raise ValueError("Calendars' ranges don't overlap")
+        mask = self._index._maskrange(o1, o2)
+        nonwork = np.isin(np.arange(7), self._nonwork_weekdays)
+        for cal in others:
+            mask = op(mask, cal._index._maskrange(o1, o2))
+            nonwork = op(nonwork, np.isin(np.arange(7), cal._nonwork_weekdays))
+        weekdays = np.flatnonzero(nonwork).tolist()
+        index = ArrayDateIndex._frommask(mask, _fromordinal(o1), weekdays)
+        return self._fromindex(index, name, self.financial)
+
+    def share(self):
+        """
+        Publish the calendar's index into shared memory.
+
+        The index is built for the whole calendar range and copied into a
+        new ``multiprocessing.shared_memory.SharedMemory`` block. Other
+        processes use the block's name with :meth:`Calendar.attach` to get
+        a calendar backed by the shared arrays.
+
+        The caller owns the block, it must be kept while it's in use and
+        then released with ``close()`` and ``unlink()``.
+
+        Returns
+        -------
+        multiprocessing.shared_memory.SharedMemory
+            The shared memory block.
+        """
+        index = self._index
+        if type(index) is not ArrayDateIndex:
+            index = ArrayDateIndex(
+                (
+                    self.__holidays_array
+                    if self.__holidays_array is not None
+                    else self._holidays
+                ),
+                self.startdate,
+                self.enddate,
+                self._nonwork_weekdays,
+                self.extend,
+            )
+        return index.share({"name": self.name, "financial": self.financial})
+
+    @classmethod
+    def attach(cls, name):
+        """
+        Attach to a calendar published with :meth:`Calendar.share`.
+
+        The calendar's index is a read-only view of the shared memory block,
+        nothing is copied. The calendar is attached once per process and
+        pickles to the block's name, so it can be sent to workers cheaply.
+
+        Parameters
+        ----------
+
+        name : str
+            Name of the shared memory block.
+
+        Returns
+        -------
+        Calendar
+            A Calendar object.
+        """
+        cal = _attached.get(name)
+        if cal is None:
+            index, meta = ArrayDateIndex.attach(name)
+            cal = cls._fromindex(index, meta["name"], meta["financial"])
+            _attached[name] = cal
+        return cal
+
+    @classmethod
+    def detach(cls, name):
+        """
+        Detach from a calendar attached with :meth:`Calendar.attach`.
+
+        The calendar is released by this process and its view of the shared
+        memory block is closed, so it must not be used afterwards. The block
+        itself is still released by its owner with ``unlink()``. Names not
+        attached are ignored.
+
+        Parameters
+        ----------
+
+        name : str
+            Name of the shared memory block.
+        """
+        cal = _attached.pop(name, None)
+        if cal is not None:
+            cal._index.detach()
+
+    def __reduce__(self):
+        shm = getattr(self._index, "_shm", None)
+        if shm is not None:
+            return (Calendar.attach, (shm.name,))
+        # the index is rebuilt on unpickling
+        if self.__holidays_array is not None:
+            holidays = self.__holidays_array
+        else:
+            holidays = self.holidays
+        args = (
+            holidays,
+            self.weekdays,
+            self.startdate,
+            self.enddate,
+            self.name,
+            self.financial,
+            self.engine,
+            self.extend,
+        )
+        return (Calendar, args)
 
     def __str__(self):
         return """Calendar: {0}
@@ -1018,7 +2728,7 @@ Financial: {4}""".format(
             self.name,
             self.startdate,
             self.enddate,
-            len(self._holidays),
+            self.__nholidays,
             self.financial,
             ", ".join(self.weekdays) if self.weekdays else "",
         )
@@ -1026,15 +2736,64 @@ Financial: {4}""".format(
     __repr__ = __str__
 
 
+# calendars attached to shared memory blocks, by block name
+_attached = {}
+
+
+def _opentext(fname):
+    # text files may be gzip compressed
+    with open(fname, "rb") as f:
+        compressed = f.read(2) == b"\x1f\x8b"
+    return gzip.open(fname, "rt") if compressed else open(fname)
+
+
 def _checkfile(fname: str) -> Dict[str, TextIO]:
     if not os.path.exists(fname):
         raise Exception(f"Invalid calendar: {fname}")
     name = os.path.split(fname)[-1]
+    if name.endswith(".gz"):
+        name = name[:-3]
     if name.endswith(".cal"):
         name = name.replace(".cal", "")
     else:
         name = None
-    return {"name": name, "iter": open(fname)}
+    return {"name": name, "iter": _opentext(fname)}
+
+
+def _cachedir():
+    path = get_option("cache.dir")
+    if path is None:
+        path = os.environ.get("XDG_CACHE_HOME") or os.path.join(
+            os.path.expanduser("~"), ".cache"
+        )
+        path = os.path.join(path, "bizdays")
+    return path
+
+
+def _readcache(key):
+    try:
+        image = np.load(os.path.join(_cachedir(), key + ".npy"))
+    except (OSError, ValueError):
+        return None
+    n = image[0]
+    return image[1 : n + 1].tolist(), image[n + 1 :].astype("datetime64[D]")
+
+
+def _writecache(key, weekdays, holidays):
+    # the calendar image is an int32 array with the number of nonworking
+    # weekdays, the nonworking weekdays and the holidays as ordinals
+    image = np.concatenate(
+        [[len(weekdays)], weekdays, holidays.astype("datetime64[D]").view(np.int64)]
+    ).astype(np.int32)
+    path = _cachedir()
+    try:
+        os.makedirs(path, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=path, suffix=".tmp")
+        with os.fdopen(fd, "wb") as f:
+            np.save(f, image)
+        os.replace(tmp, os.path.join(path, key + ".npy"))
+    except OSError:
+        pass
 
 
 def _checklocalfile(name: str) -> Dict[str, TextIO]:
@@ -1054,10 +2813,68 @@ class VectorizedOps(object):
     def __init__(self, calendar):
         self.cal = calendar
 
-    def isbizday(self, dates):
-        return (self.cal.isbizday(dt) for dt in dates)
+    def isbizday(self, dates, format=None):
+        return (self.cal.isbizday(dt, format) for dt in dates)
 
-    def bizdays(self, dates_from, dates_to):
+    def _vectorized(self, errors):
+        # errors other than raise are handled by the array engines only
+        _checkerrors(errors)
+        if self.cal._index.vectorized:
+            return True
+        if errors != "raise":
+            raise ValueError("errors=%s requires an array-based engine" % errors)
+        return False
+
+    def _inrange(self, ords, nulls, errors):
+        # the range is checked once, through min/max of the non-null dates,
+        # dates out of it are masked as nulls (coerce) or moved to the range
+        # bounds (clip) and their count is logged
+        ix = self.cal._index
+        if errors == "raise" or ix.extend or not len(ords):
+            return ords, nulls
+        valid = ~nulls
+        lo = ords.min(where=valid, initial=ix._end)
+        hi = ords.max(where=valid, initial=ix._start)
+        if ix._start <= lo and hi <= ix._end:
+            return ords, nulls
+        out = ((ords < ix._start) | (ords > ix._end)) & valid
+        if errors == "coerce":
+            nulls = nulls | out
+        else:
+            ords = np.clip(ords, ix._start, ix._end)
+        count = int(out.sum())
+        logger.warning(
+            "%d dates out of calendar %s range (%s)",
+            count,
+            self.cal.name,
+            errors,
+            extra={"calendar": self.cal.name, "errors": errors, "count": count},
+        )
+        return ords, nulls
+
+    def isbizday_array(self, dates, format=None, errors="raise"):
+        """
+        Checks business days with the array engine.
+
+        Only non-null dates are checked, the result is masked at the null
+        ones. Strings are parsed with `format` and dates out of the range
+        are handled according to `errors`.
+        Returns None if the calendar's engine is not vectorized or the
+        given dates can't be converted to ordinals.
+        """
+        if not self._vectorized(errors):
+            return None
+        res = _asordinals(dates, format)
+        if res is None:
+            return None
+        ords, nulls = self._inrange(*res, errors)
+        return _onvalid(self._isbizday, nulls, ords)
+
+    def _isbizday(self, ords):
+        ix = self.cal._index
+        return ~ix._ishol(ix._checkarray(ords))
+
+    def bizdays(self, dates_from, dates_to, format=None):
         if not isseq(dates_from):
             dates_from = [dates_from]
         if not isseq(dates_to):
@@ -1072,30 +2889,119 @@ class VectorizedOps(object):
         else:
             dates_to = cycle(dates_to)
         return (
-            self.cal.bizdays(_from, _to) for _from, _to in zip(dates_from, dates_to)
+            self.cal.bizdays(_from, _to, format)
+            for _from, _to in zip(dates_from, dates_to)
+        )
+
+    def bizdays_array(self, dates_from, dates_to, format=None, errors="raise"):
+        """
+        Computes bizdays with the array engine.
+
+        Only pairs of non-null dates are computed, the result is masked at
+        the other ones. Strings are parsed with `format` and dates out of
+        the range are handled according to `errors`.
+        Returns None if the calendar's engine is not vectorized or the
+        given dates can't be converted to ordinals.
+        """
+        if not self._vectorized(errors):
+            return None
+        if not isseq(dates_from):
+            dates_from = [dates_from]
+        if not isseq(dates_to):
+            dates_to = [dates_to]
+        lengths = [len(dates_from), len(dates_to)]
+        if max(lengths) % min(lengths) != 0:
+            raise Exception(
+                "from length must be multiple of to length and " "vice-versa"
+            )
+        res_from = _asordinals(dates_from, format)
+        res_to = _asordinals(dates_to, format)
+        if res_from is None or res_to is None:
+            return None
+        ords_from, nulls_from = self._inrange(*res_from, errors)
+        ords_to, nulls_to = self._inrange(*res_to, errors)
+        n = max(lengths)
+        nulls = np.resize(nulls_from, n) | np.resize(nulls_to, n)
+        return _onvalid(
+            self._bizdays, nulls, np.resize(ords_from, n), np.resize(ords_to, n)
         )
 
-    def adjust_next(self, dates):
+    def _bizdays(self, ords_from, ords_to):
+        ix = self.cal._index
+        date_reverse = ords_from > ords_to
+        o1 = ix._checkarray(np.minimum(ords_from, ords_to))
+        o2 = ix._checkarray(np.maximum(ords_from, ords_to))
+        i1 = ix._fwdcount(o2) - ix._fwdcount(o1)
+        i2 = ix._bwdcount(o2) - ix._bwdcount(o1)
+        adj_vec = ix._ishol(o1) & ix._ishol(o2)
+        bdays = np.minimum(i1, i2).astype(np.int64) - adj_vec
+        bdays = np.where(date_reverse, -bdays, bdays)
+        if self.cal.financial:
+            bdays[adj_vec & (np.abs(bdays) == 1)] = 0
+            return bdays
+        else:
+            return np.where(date_reverse, bdays - 1, bdays + 1)
+
+    def adjust_next(self, dates, format=None):
+        if not isseq(dates):
+            dates = [dates]
+        return (self.cal.adjust_next(dt, format) for dt in dates)
+
+    def adjust_array(self, dates, convention, format=None, errors="raise"):
+        """
+        Adjusts dates with the array engine.
+
+        convention is one of following, preceding, modified_following and
+        modified_preceding, null dates are returned as NaT, strings are
+        parsed with `format` and dates out of the range are handled
+        according to `errors`.
+        Returns None if the calendar's engine is not vectorized or the
+        given dates can't be converted to ordinals.
+        """
+        if not self._vectorized(errors):
+            return None
         if not isseq(dates):
             dates = [dates]
-        return (self.cal.adjust_next(dt) for dt in dates)
+        res = _asordinals(dates, format)
+        if res is None:
+            return None
+        ords, nulls = self._inrange(*res, errors)
+        return _onvalid(
+            lambda o: self._adjust(o, convention).astype("datetime64[D]"), nulls, ords
+        )
 
-    def modified_following(self, dates):
+    def _adjust(self, ords, convention):
+        ix = self.cal._index
+        ix._checkarray(ords)
+        if convention in ("following", "modified_following"):
+            res = ix._bizdayarray(ix._bwdcount(ords))
+            rollback = ix._fwdcount
+        elif convention in ("preceding", "modified_preceding"):
+            res = ix._bizdayarray(ix._fwdcount(ords))
+            rollback = ix._bwdcount
+        else:
+            raise ValueError("Invalid convention: %s" % convention)
+        if convention.startswith("modified"):
+            m = ix._monthof(res) != ix._monthof(ords)
+            res[m] = ix._bizdayarray(rollback(ords[m]))
+        return res
+
+    def modified_following(self, dates, format=None):
         if not isseq(dates):
             dates = [dates]
-        return (self.cal.modified_following(dt) for dt in dates)
+        return (self.cal.modified_following(dt, format) for dt in dates)
 
-    def adjust_previous(self, dates):
+    def adjust_previous(self, dates, format=None):
         if not isseq(dates):
             dates = [dates]
-        return (self.cal.adjust_previous(dt) for dt in dates)
+        return (self.cal.adjust_previous(dt, format) for dt in dates)
 
-    def modified_preceding(self, dates):
+    def modified_preceding(self, dates, format=None):
         if not isseq(dates):
             dates = [dates]
-        return (self.cal.modified_preceding(dt) for dt in dates)
+        return (self.cal.modified_preceding(dt, format) for dt in dates)
 
-    def offset(self, dates, ns):
+    def offset(self, dates, ns, format=None):
         if not isseq(dates):
             dates = [dates]
         if not isseq(ns):
@@ -1104,7 +3010,55 @@ class VectorizedOps(object):
             dates = cycle(dates)
         else:
             ns = cycle(ns)
-        return (self.cal.offset(dt, n) for dt, n in zip(dates, ns))
+        return (self.cal.offset(dt, n, format) for dt, n in zip(dates, ns))
+
+    def offset_array(self, dates, ns, format=None, errors="raise"):
+        """
+        Offsets dates with the array engine.
+
+        dates and ns are broadcast following NumPy rules, sequences with
+        incompatible lengths are recycled, null dates are returned as NaT,
+        strings are parsed with `format` and dates out of the range are
+        handled according to `errors`.
+        Returns None if the calendar's engine is not vectorized or the
+        given dates can't be converted to ordinals.
+        """
+        if not self._vectorized(errors):
+            return None
+        if not isseq(dates):
+            dates = [dates]
+        if not isseq(ns):
+            ns = [ns]
+        res = _asordinals(dates, format)
+        ns = np.asarray(ns)
+        if res is None or ns.dtype.kind not in "iu":
+            return None
+        ords, nulls = self._inrange(*res, errors)
+        try:
+            ords, nulls, ns = np.broadcast_arrays(ords, nulls, ns)
+        except ValueError:
+            size = max(len(ords), len(ns))
+            ords, nulls, ns = (
+                np.resize(ords, size),
+                np.resize(nulls, size),
+                np.resize(ns, size),
+            )
+        return _onvalid(self._offset, nulls.ravel(), ords.ravel(), ns.ravel())
+
+    def _offset(self, ords, ns):
+        ix = self.cal._index
+        ix._checkarray(ords)
+        k = ix._fwdcount(ords) + ns
+        neg = ns < 0
+        if neg.any():
+            k[neg] = ix._bwdcount(ords[neg]) + ns[neg]
+        zero = ns == 0
+        if zero.any():
+            res = ords.copy()
+            res[~zero] = ix._bizdayarray(k[~zero])
+        else:
+            res = ix._bizdayarray(k)
+        return res.astype("datetime64[D]")
 
     def getdate(self, expr, year, month):
         if not isseq(expr):
@@ -1134,3 +3088,443 @@ class VectorizedOps(object):
         else:
             year = cycle(year)
         return (self.cal.getbizdays(ye, mo) for ye, mo in zip(year, month))
+
+
+class CalendarRegistry(object):
+    """
+    Registry of shared calendars
+
+    Calendars are loaded once and the same instance is returned to every
+    caller, so they are read-only: setting their attributes, like
+    ``financial`` or ``extend``, raises ``AttributeError``. Methods like
+    :meth:`Calendar.add_holidays` return new, writable calendars. Bundled
+    and PMC calendars are keyed by name and calendar files by path,
+    modification time and size, a file that changes on disk is loaded again.
+
+    Parameters
+    ----------
+    maxsize : int
+        Maximum number of calendars held, the least recently used calendar
+        is evicted when it is exceeded. ``None`` (default) means unbounded.
+    """
+
+    def __init__(self, maxsize=None):
+        self._calendars = OrderedDict()
+        self._lock = threading.RLock()
+        self._maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __get_maxsize(self):
+        return self._maxsize
+
+    def __set_maxsize(self, maxsize):
+        with self._lock:
+            self._maxsize = maxsize
+            self._evict()
+
+    maxsize = property(__get_maxsize, __set_maxsize)
+
+    def _key(self, name=None, filename=None):
+        if filename:
+            fname = os.path.abspath(filename)
+            st = os.stat(fname)
+            return ("file", fname, st.st_mtime_ns, st.st_size)
+        elif name:
+            return ("pmc" if name.startswith("PMC/") else "name", name)
+        else:
+            raise ValueError("Either name or filename must be given")
+
+    def _evict(self):
+        while self._maxsize is not None and len(self._calendars) > self._maxsize:
+            self._calendars.popitem(last=False)
+            self.evictions += 1
+
+    def get(self, name=None, filename=None):
+        """
+        Return the shared calendar, loading it on first use.
+
+        Accepts the same arguments of :meth:`Calendar.load`.
+
+        Returns
+        -------
+        Calendar
+            A Calendar object shared with the other callers.
+        """
+        key = self._key(name, filename)
+        with self._lock:
+            cal = self._calendars.get(key)
+            if cal is not None:
+                self._calendars.move_to_end(key)
+                self.hits += 1
+                return cal
+            self.misses += 1
+            cal = Calendar.load(name=name, filename=filename)
+            object.__setattr__(cal, "_readonly", True)
+            if filename:
+                # drop the calendars of previous versions of the file
+                for k in [k for k in self._calendars if k[:2] == key[:2]]:
+                    del self._calendars[k]
+            self._calendars[key] = cal
+            self._evict()
+            return cal
+
+    def invalidate(self, name=None, filename=None):
+        """
+        Remove calendars from the registry.
+
+        The calendar given by name or filename is removed, with no
+        arguments all calendars are removed.
+
+        Returns
+        -------
+        int
+            The number of calendars removed.
+        """
+        with self._lock:
+            if name is None and filename is None:
+                n = len(self._calendars)
+                self._calendars.clear()
+                return n
+            if filename:
+                key = ("file", os.path.abspath(filename))
+            else:
+                key = self._key(name)
+            keys = [k for k in self._calendars if k[: len(key)] == key]
+            for k in keys:
+                del self._calendars[k]
+            return len(keys)
+
+    def __get_nbytes(self):
+        with self._lock:
+            return sum(cal._index.nbytes for cal in self._calendars.values())
+
+    nbytes = property(__get_nbytes)
+
+    def stats(self):
+        """
+        Registry statistics
+
+        Returns
+        -------
+        dict
+            Hits, misses and evictions counts, the number of calendars held,
+            the maximum size and the bytes held by the calendars' indexes.
+        """
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "size": len(self._calendars),
+                "maxsize": self._maxsize,
+                "nbytes": self.nbytes,
+            }
+
+    def __len__(self):
+        return len(self._calendars)
+
+    def _dispatch(self, calendars, *arrays):
+        # broadcasts the calendar names and the arrays, groups the rows by
+        # calendar and returns the number of rows and the groups, each
+        # with its calendar, rows and slices of the arrays
+        names, *arrays = np.broadcast_arrays(
+            np.asarray(calendars, dtype=object), *arrays
+        )
+        names = names.ravel()
+        arrays = [a.ravel() for a in arrays]
+        uniq, inv = np.unique(names.astype(str), return_inverse=True)
+        order = np.argsort(inv, kind="stable")
+        bounds = np.searchsorted(inv[order], np.arange(len(uniq) + 1))
+        groups = []
+        for i, name in enumerate(uniq.tolist()):
+            rows = order[bounds[i] : bounds[i + 1]]
+            groups.append((self.get(name), rows, [a[rows] for a in arrays]))
+        return len(names), groups
+
+    def isbizday(self, dates, calendars):
+        """
+        Checks if the dates are business days, each in its own calendar.
+
+        Rows are grouped by calendar, each group is checked with one
+        vectorized call and the results are returned in the original
+        order. Calendars are taken from the registry. Requires NumPy.
+
+        Parameters
+        ----------
+
+        dates : sequence of dates
+            Dates to be checked.
+
+        calendars : str or sequence of str
+            Calendar names, one per date.
+
+        Returns
+        -------
+        list of bool, array of bool
+        """
+        n, groups = self._dispatch(calendars, _ordinalarray(dates))
+        res = np.empty(n, dtype=bool)
+        for cal, rows, (ords,) in groups:
+            res[rows] = cal.vec._isbizday(ords)
+        return recseq(res, "array")
+
+    def bizdays(self, dates_from, dates_to, calendars):
+        """
+        Calculate the amount of business days between dates, each pair in
+        its own calendar.
+
+        Rows are grouped by calendar, each group is computed with one
+        vectorized call and the results are returned in the original
+        order. Calendars are taken from the registry. Requires NumPy.
+
+        Parameters
+        ----------
+
+        dates_from : sequence of dates
+            Initial dates.
+
+        dates_to : sequence of dates
+            Final dates.
+
+        calendars : str or sequence of str
+            Calendar names, one per pair of dates.
+
+        Returns
+        -------
+        list of int, array of int
+        """
+        n, groups = self._dispatch(
+            calendars, _ordinalarray(dates_from), _ordinalarray(dates_to)
+        )
+        res = np.empty(n, dtype=np.int64)
+        for cal, rows, (ords_from, ords_to) in groups:
+            res[rows] = cal.vec._bizdays(ords_from, ords_to)
+        return recseq(res, "array")
+
+    def offset(self, dates, n, calendars):
+        """
+        Offsets the dates by n business days, each in its own calendar.
+
+        Rows are grouped by calendar, each group is computed with one
+        vectorized call and the results are returned in the original
+        order. Calendars are taken from the registry. Requires NumPy.
+
+        Parameters
+        ----------
+
+        dates : sequence of dates
+            Dates to be offset.
+
+        n : int or sequence of int
+            The amount of business days to offset.
+
+        calendars : str or sequence of str
+            Calendar names, one per date.
+
+        Returns
+        -------
+        list of dates, pandas.DatetimeIndex
+        """
+        size, groups = self._dispatch(
+            calendars, _ordinalarray(dates), np.asarray(n, dtype=np.int64)
+        )
+        res = np.empty(size, dtype="datetime64[D]")
+        for cal, rows, (ords, ns) in groups:
+            res[rows] = cal.vec._offset(ords, ns)
+        return recseq(res)
+
+    def __contains__(self, name):
+        return ("pmc" if name.startswith("PMC/") else "name", name) in self._calendars
+
+
+registry = CalendarRegistry()
+
+
+def get_calendar(name=None, filename=None):
+    """
+    Return a calendar shared by the whole process.
+
+    The calendar is loaded with :meth:`Calendar.load` on first use and kept
+    in ``bizdays.registry``, later calls return the same instance.
+
+    Parameters
+    ----------
+
+    name : str
+        Name of the calendar.
+
+    filename : str
+        Text file with holidays and weekdays.
+
+    Returns
+    -------
+    Calendar
+        A Calendar object, it must not be modified.
+    """
+    return registry.get(name=name, filename=filename)
+
+
+class CalendarSet(object):
+    """
+    Calendars evaluated together
+
+    The holiday masks and the cumulative counts of business days of the
+    calendars are stacked in 2-D arrays, one row per calendar, over the
+    range the calendars have in common, so every method answers for all
+    calendars in one vectorized call and returns an array with one row per
+    calendar and one column per date. Requires NumPy.
+
+    Parameters
+    ----------
+    calendars : list of Calendar or str
+        Calendars, names are loaded with :func:`get_calendar`.
+
+    startdate : str or datetime.date
+        Start of the range, defaults to the latest start date of the
+        calendars.
+
+    enddate : str or datetime.date
+        End of the range, defaults to the earliest end date of the
+        calendars.
+    """
+
+    def __init__(self, calendars, startdate=None, enddate=None):
+        self.calendars = [get_calendar(cal) if isstr(cal) else cal for cal in calendars]
+        if not self.calendars:
+            raise ValueError("No calendars given")
+        o1 = max(_ordinal(cal.startdate) for cal in self.calendars)
+        o2 = min(_ordinal(cal.enddate) for cal in self.calendars)
+        if startdate is not None:
+            o1 = max(o1, _ordinal(startdate))
+        if enddate is not None:
+            o2 = min(o2, _ordinal(enddate))
+        if o1 > o2:
+            raise ValueError("Calendars' ranges don't overlap")
+        self.startdate = _fromordinal(o1)
+        self.enddate = _fromordinal(o2)
+        self._start = o1
+        self._end = o2
+        self._holmask = np.stack(
+            [cal._index._maskrange(o1, o2) for cal in self.calendars]
+        )
+        self._fwd = np.cumsum(~self._holmask, axis=1, dtype=np.int32)
+        self._bwd = self._fwd + self._holmask
+        self._financial = np.array([cal.financial for cal in self.calendars])
+        # the business days of all calendars, row after row, as positions
+        # in the range
+        counts = self._fwd[:, -1].astype(np.int64)
+        self._counts = counts[:, None]
+        self._first = (np.cumsum(counts) - counts)[:, None]
+        self._bizdays = np.nonzero(~self._holmask)[1].astype(np.int32)
+
+    def __get_names(self):
+        return [cal.name for cal in self.calendars]
+
+    names = property(__get_names)
+
+    def __get_nbytes(self):
+        return (
+            self._holmask.nbytes
+            + self._fwd.nbytes
+            + self._bwd.nbytes
+            + self._bizdays.nbytes
+        )
+
+    nbytes = property(__get_nbytes)
+
+    def __len__(self):
+        return len(self.calendars)
+
+    def _positions(self, dates):
+        ords = _ordinalarray(dates)
+        if len(ords) and (ords.min() < self._start or ords.max() > self._end):
+            raise DateOutOfRange("Given date out of calendar range")
+        return ords - self._start
+
+    def isbizday(self, dates):
+        """
+        Checks whether the dates are business days in each calendar.
+
+        Parameters
+        ----------
+
+        dates : sequence of dates
+            Dates can be ISO formated string, datetime.date,
+            datetime.datetime or datetime64.
+
+        Returns
+        -------
+        numpy.ndarray
+            Boolean array with one row per calendar.
+        """
+        return ~self._holmask[:, self._positions(dates)]
+
+    def bizdays(self, dates_from, dates_to):
+        """
+        Calculate the amount of business days between dates in each
+        calendar.
+
+        The sequences are broadcast following NumPy rules.
+
+        Parameters
+        ----------
+
+        dates_from : sequence of dates
+            Initial dates.
+
+        dates_to : sequence of dates
+            Final dates.
+
+        Returns
+        -------
+        numpy.ndarray
+            Integer array with one row per calendar.
+        """
+        p_from, p_to = np.broadcast_arrays(
+            self._positions(dates_from), self._positions(dates_to)
+        )
+        date_reverse = p_from > p_to
+        p1 = np.minimum(p_from, p_to)
+        p2 = np.maximum(p_from, p_to)
+        i1 = self._fwd[:, p2] - self._fwd[:, p1]
+        i2 = self._bwd[:, p2] - self._bwd[:, p1]
+        adj = self._holmask[:, p1] & self._holmask[:, p2]
+        bdays = np.minimum(i1, i2).astype(np.int64) - adj
+        bdays = np.where(date_reverse, -bdays, bdays)
+        fin = self._financial[:, None]
+        bdays[fin & adj & (np.abs(bdays) == 1)] = 0
+        return np.where(fin, bdays, np.where(date_reverse, bdays - 1, bdays + 1))
+
+    def offset(self, dates, n):
+        """
+        Offset the dates by ``n`` business days in each calendar.
+
+        The dates and ``n`` are broadcast following NumPy rules.
+
+        Parameters
+        ----------
+
+        dates : sequence of dates
+            Dates to be offset.
+
+        n : int or sequence of int
+            Number of business days, negative values go backwards.
+
+        Returns
+        -------
+        numpy.ndarray
+            ``datetime64[D]`` array with one row per calendar.
+        """
+        pos, n = np.broadcast_arrays(
+            self._positions(dates), np.asarray(n, dtype=np.int64)
+        )
+        k = np.where(n < 0, self._bwd[:, pos], self._fwd[:, pos]) + n
+        zero = n == 0
+        k[:, zero] = 1
+        if ((k < 1) | (k > self._counts)).any():
+            raise DateOutOfRange("Given date out of calendar range")
+        res = self._bizdays[self._first + k - 1].astype(np.int64)
+        res[:, zero] = pos[zero]
+        return (res + self._start).astype("datetime64[D]")
@@ -0,0 +1,26 @@
+import shutil
+import tempfile
+
+import bizdays
+import pytest
+
+# calendar images go to temporary directories, not the user's cache
+CACHE_DIR = tempfile.mkdtemp(prefix="bizdays-cache-")
+
+
+def pytest_configure(config):
+    # calendars loaded while the tests are collected use the session's cache
+    bizdays.set_option("cache.dir", CACHE_DIR)
+
+
+def pytest_unconfigure(config):
+    bizdays.set_option("cache.dir", None)
+    shutil.rmtree(CACHE_DIR, ignore_errors=True)
+
+
+@pytest.fixture(autouse=True)
+def cache_dir(tmp_path_factory, monkeypatch):
+    # each test starts with an empty cache
+    path = tmp_path_factory.mktemp("cache")
+    monkeypatch.setitem(bizdays.options, "cache.dir", str(path))
+    return path
@@ -1,10 +1,24 @@
+import os
+import pickle
+import py_compile
+import subprocess
+import sys
+import threading
 import unittest
 from random import shuffle
 
+import numpy as np
 import pytest
 from bizdays import *
-from bizdays import isseq, Date, DateIndex, load_holidays, DateOutOfRange
-from datetime import datetime, timedelta
+from bizdays import (
+    isseq,
+    Date,
+    DateIndex,
+    ArrayDateIndex,
+    load_holidays,
+    DateOutOfRange,
+)
+from datetime import date, datetime, timedelta
 
 
 def asDate(dt):
@@ -26,6 +40,13 @@ def setup_data():
     set_option("mode", "python")
 
 
+@pytest.fixture(params=["array", "dict", "bisect"])
+def anbima(request):
+    # ANBIMA's holidays in each engine
+    cal = Calendar.load("ANBIMA")
+    return Calendar(cal.holidays, weekdays=cal.weekdays, engine=request.param)
+
+
 class BizdaysTest(unittest.TestCase):
     def setUp(self):
         set_option("mode", "python")
@@ -157,10 +178,35 @@ class TestVectorizedOpsInCalendar(BizdaysTest):
     def test_isbizday(self):
         assert self.cal.isbizday(("2013-01-02", "2013-01-03")) == [True, True]
 
+    def test_isbizday_array_engine(self):
+        "it should check the same dates of the scalar method"
+        cal = Calendar.load("ANBIMA")
+        dates = list(seqDate(asDate("2013-12-20"), asDate("2014-01-13"), days=1))
+        assert cal.isbizday(dates) == [cal.isbizday(dt) for dt in dates]
+        assert cal.isbizday(["2013-01-01", None, "2013-01-02"]) == [False, None, True]
+        with self.assertRaises(DateOutOfRange):
+            cal.isbizday(("2013-01-02", "1990-01-01"))
+
     def test_bizdays(self):
         bizdays = self.cal.bizdays
         assert bizdays(("2013-01-02", "2013-01-03"), "2013-01-03") == [1, 0]
 
+    def test_bizdays_array_engine(self):
+        "it should compute the same bizdays of the scalar method"
+        for financial in (True, False):
+            cal = Calendar.load("ANBIMA")
+            cal.financial = financial
+            dates_from = list(
+                seqDate(asDate("2013-12-20"), asDate("2014-01-10"), days=1)
+            )
+            dates_to = list(reversed(dates_from))
+            x = [cal.bizdays(d1, d2) for d1, d2 in zip(dates_from, dates_to)]
+            assert cal.bizdays(dates_from, dates_to) == x
+            x = [cal.bizdays(d1, "2014-01-01") for d1 in dates_from]
+            assert cal.bizdays(dates_from, "2014-01-01") == x
+        with self.assertRaises(DateOutOfRange):
+            cal.bizdays(("2013-01-02", "1990-01-01"), "2013-01-03")
+
     def test_adjust(self):
         adjust = self.cal.adjust_next
         assert adjust(("2013-01-02", "2013-01-03")) == asDate(["2013-01-02", "2013-01-03"])
@@ -180,6 +226,31 @@ class TestVectorizedOpsInCalendar(BizdaysTest):
         assert offset(("2013-01-02", "2013-01-03"), 1) == asDate(["2013-01-03", "2013-01-04"])
         assert offset("2013-01-02", [1, 2]) == asDate(["2013-01-03", "2013-01-04"])
 
+    def test_adjust_array_engine(self):
+        "it should adjust the same dates of the scalar methods"
+        cal = Calendar.load("ANBIMA")
+        dates = list(seqDate(asDate("2013-12-20"), asDate("2014-01-13"), days=1))
+        dates += ["2016-01-31", "2021-05-01", "2022-04-30"]
+        for adjust in (
+            cal.following,
+            cal.preceding,
+            cal.modified_following,
+            cal.modified_preceding,
+        ):
+            assert adjust(dates) == [adjust(dt) for dt in dates]
+
+    def test_offset_array_engine(self):
+        "it should offset the same dates of the scalar method"
+        cal = Calendar.load("ANBIMA")
+        dates = list(seqDate(asDate("2013-12-20"), asDate("2014-01-13"), days=1))
+        ns = [-3, -1, 0, 1, 2]
+        x = [cal.offset(dt, n) for dt, n in zip(dates, ns * 5)]
+        assert cal.offset(dates, ns * 5) == x
+        x = [cal.offset(dt, 2) for dt in dates]
+        assert cal.offset(dates, 2) == x
+        x = [cal.offset(dt, n) for dt, n in zip(dates[:3] * 2, range(6))]
+        assert cal.offset(dates[:3], range(6)) == x
+
     def test_getdate(self):
         expr = "15th day"
         x = self.cal.getdate(expr, [2002, 2001], 1)
@@ -693,6 +764,18 @@ class TestDateIndex(BizdaysTest):
         self.assertEqual(di.preceding("2011-01-09").isoformat(), "2011-01-07")
         self.assertEqual(di.preceding("2011-01-07").isoformat(), "2011-01-07")
 
+    def test_DateIndex_following_preceding_long_holidays(self):
+        "it should adjust dates along holiday stretches longer than the recursion limit"
+        holidays = list(seqDate(asDate("2000-01-01"), asDate("2008-01-01"), days=1))
+        di = DateIndex(
+            holidays, startdate="1999-11-27", enddate="2010-01-01", weekdays=(5, 6)
+        )
+        self.assertEqual(di.following("2001-01-01").isoformat(), "2008-01-02")
+        self.assertEqual(di.preceding("2007-01-01").isoformat(), "1999-12-31")
+        self.assertEqual(di.modified_following("2007-01-01").isoformat(), "1999-12-31")
+        with self.assertRaises(DateOutOfRange):
+            di.preceding("1999-11-28")
+
     def test_DateIndex_offset(self):
         "it should test DateIndex"
         holidays = load_holidays("ANBIMA.txt")
@@ -802,6 +885,342 @@ class TestDateIndex(BizdaysTest):
         )
 
 
+class TestArrayDateIndex(BizdaysTest):
+    holidays = load_holidays("ANBIMA.txt")
+    dix = DateIndex(
+        holidays, startdate=min(holidays), enddate=max(holidays), weekdays=(5, 6)
+    )
+    aix = ArrayDateIndex(
+        holidays, startdate=min(holidays), enddate=max(holidays), weekdays=(5, 6)
+    )
+
+    def test_ArrayDateIndex_get(self):
+        "it should store the same counts of the dict index"
+        for dt in seqDate(asDate("2010-12-20"), asDate("2011-01-20"), days=1):
+            assert self.aix[dt] == self.dix[dt]
+
+    def test_ArrayDateIndex_adjust(self):
+        "it should adjust dates as the dict index"
+        for dt in seqDate(asDate("2011-12-20"), asDate("2012-01-20"), days=1):
+            assert self.aix.following(dt) == self.dix.following(dt)
+            assert self.aix.preceding(dt) == self.dix.preceding(dt)
+            assert self.aix.modified_following(dt) == self.dix.modified_following(dt)
+            assert self.aix.modified_preceding(dt) == self.dix.modified_preceding(dt)
+
+    def test_ArrayDateIndex_offset_seq(self):
+        "it should offset dates and create sequences as the dict index"
+        for n in (-3, -1, 0, 1, 3):
+            assert self.aix.offset("2012-01-01", n) == self.dix.offset("2012-01-01", n)
+        seq = self.aix.seq("2011-01-01", "2011-01-14")
+        assert seq == self.dix.seq("2011-01-01", "2011-01-14")
+
+    def test_ArrayDateIndex_getdate(self):
+        "it should getdate as the dict index"
+        exprs = (
+            "first bizday",
+            "last bizday",
+            "last fri",
+            "second bizday before 15th day",
+            "first tue before second day",
+            "10th fri before 10th bizday",
+        )
+        for expr in exprs:
+            assert self.aix.getdate(expr, 2002, 5) == self.dix.getdate(expr, 2002, 5)
+        assert self.aix.getbizdays(2002) == self.dix.getbizdays(2002)
+        assert self.aix.getbizdays(2002, 2) == self.dix.getbizdays(2002, 2)
+
+    def test_ArrayDateIndex_lazy_chunks(self):
+        "it should load only the years that are accessed"
+        aix = ArrayDateIndex(
+            self.holidays,
+            startdate=min(self.holidays),
+            enddate=max(self.holidays),
+            weekdays=(5, 6),
+        )
+        assert sum(aix._loaded) == 0
+        assert aix.offset("2011-01-07", 1) == self.dix.offset("2011-01-07", 1)
+        assert sum(aix._loaded) == 1
+        assert aix["2070-06-01"] == self.dix["2070-06-01"]
+        assert aix["2011-12-30"] == self.dix["2011-12-30"]
+        assert sum(aix._loaded) == 2
+        assert aix.offset("2011-12-30", 2) == self.dix.offset("2011-12-30", 2)
+        assert sum(aix._loaded) == 3
+
+    def test_ArrayDateIndex_out_of_range(self):
+        "it should raise DateOutOfRange"
+        with self.assertRaises(DateOutOfRange):
+            self.aix.following("1990-01-01")
+        with self.assertRaises(DateOutOfRange):
+            self.aix.offset(max(self.holidays), 10)
+
+
+def test_calendar_engine():
+    assert Calendar(["2023-01-02"]).engine == "array"
+    assert Calendar().engine == "weekday"
+    assert Calendar(weekdays=("Saturday", "Sunday")).engine == "weekday"
+    assert Calendar.load("Actual").engine == "weekday"
+    cal1 = Calendar.load("ANBIMA")
+    cal2 = Calendar(cal1.holidays, weekdays=cal1.weekdays, engine="dict")
+    assert cal1.bizdays("2013-08-13", "2025-01-02") == cal2.bizdays(
+        "2013-08-13", "2025-01-02"
+    )
+    with pytest.raises(ValueError):
+        Calendar(engine="btree")
+
+
+@pytest.mark.parametrize(
+    "weekdays", [(), ("Saturday", "Sunday"), ("Monday", "Wednesday", "Friday")]
+)
+def test_weekday_engine(weekdays):
+    cal = Calendar(weekdays=weekdays)
+    ref = Calendar(
+        ["1960-01-01"],
+        weekdays=weekdays,
+        startdate=cal.startdate,
+        enddate=cal.enddate,
+        engine="dict",
+    )
+    dates = [date(1990, 1, 1) + timedelta(37 * i + i % 5) for i in range(300)]
+    ns = [i % 23 - 11 for i in range(300)]
+    assert cal.bizdays(dates[:-1], dates[1:]) == ref.bizdays(dates[:-1], dates[1:])
+    assert cal.isbizday(dates) == ref.isbizday(dates)
+    assert cal.offset(dates, ns) == ref.offset(dates, ns)
+    assert cal.modified_following(dates) == ref.modified_following(dates)
+    assert cal.modified_preceding(dates) == ref.modified_preceding(dates)
+    for dt, n in zip(dates[:50], ns):
+        assert cal.offset(dt, n) == ref.offset(dt, n)
+        assert cal.following(dt) == ref.following(dt)
+        assert cal.preceding(dt) == ref.preceding(dt)
+    assert cal.seq("2001-02-03", "2001-05-06") == ref.seq("2001-02-03", "2001-05-06")
+    assert cal.getbizdays(2024, 2) == ref.getbizdays(2024, 2)
+    assert cal.getdate("last bizday", 2024, 2) == ref.getdate("last bizday", 2024, 2)
+    with pytest.raises(DateOutOfRange):
+        cal.offset("2070-12-30", 10)
+
+
+def test_weekday_engine_unbounded():
+    cal = Calendar(
+        weekdays=("Saturday", "Sunday"), startdate=date.min, enddate=date.max
+    )
+    assert cal.engine == "weekday"
+    assert cal.bizdays("1000-01-01", "9000-01-01") == 2087100
+    assert cal.offset("9999-12-30", -5) == date(9999, 12, 23)
+    assert cal._index.nbytes < 100
+    cal = Calendar(weekdays=("Saturday", "Sunday"), extend=True)
+    assert cal.offset("2070-12-30", 10) == date(2071, 1, 13)
+    assert cal.enddate == date(2071, 12, 31)
+    cal2 = cal.add_holidays("2024-11-20")
+    assert cal2.engine == "array"
+    assert cal2.bizdays("2024-11-19", "2024-11-21") == 1
+
+
+@pytest.mark.parametrize("anbima", ["bisect"], indirect=True)
+def test_bisect_engine(anbima):
+    cal = anbima
+    ref = Calendar.load("ANBIMA")
+    assert cal.engine == "bisect"
+    assert cal.startdate == ref.startdate
+    assert cal.enddate == ref.enddate
+    assert cal._index.nbytes < ref._index.nbytes / 10
+    dates = [date(2001, 1, 1) + timedelta(97 * i + i % 7) for i in range(360)]
+    ns = [i % 41 - 20 for i in range(360)]
+    assert cal.bizdays(dates[:-1], dates[1:]) == ref.bizdays(dates[:-1], dates[1:])
+    assert cal.isbizday(dates) == ref.isbizday(dates)
+    assert cal.offset(dates, ns) == ref.offset(dates, ns)
+    assert cal.modified_following(dates) == ref.modified_following(dates)
+    assert cal.modified_preceding(dates) == ref.modified_preceding(dates)
+    for dt, n in zip(dates[:60], ns):
+        assert cal.bizdays(dt, dates[-1]) == ref.bizdays(dt, dates[-1])
+        assert cal.offset(dt, n) == ref.offset(dt, n)
+        assert cal.following(dt) == ref.following(dt)
+        assert cal.preceding(dt) == ref.preceding(dt)
+        assert cal.isbizday(dt) == ref.isbizday(dt)
+    assert cal.seq("2001-12-20", "2002-01-10") == ref.seq("2001-12-20", "2002-01-10")
+    assert cal.getbizdays(2024) == ref.getbizdays(2024) == 253
+    assert cal.getdate("last bizday", 2024, 12) == date(2024, 12, 31)
+    assert cal.getdate("1st bizday after 10th day", 2024, 2) == date(2024, 2, 14)
+    assert not cal.add_holidays("2024-11-21").isbizday("2024-11-21")
+    assert cal.remove_holidays("2024-12-25").isbizday("2024-12-25")
+    with pytest.raises(DateOutOfRange):
+        cal.offset("2099-12-20", 10)
+    cal = Calendar(
+        ref.holidays,
+        weekdays=ref.weekdays,
+        startdate=date.min,
+        enddate=date.max,
+        engine="bisect",
+    )
+    assert cal.bizdays("1900-01-01", "2200-12-31") > 0
+    assert pickle.loads(pickle.dumps(cal)).engine == "bisect"
+
+
+def test_array_engine_threads():
+    anbima = Calendar.load("ANBIMA")
+    ref = Calendar(anbima.holidays, weekdays=anbima.weekdays, engine="dict")
+    dates = [date(2001, 1, 1) + timedelta(23 * i + i % 7) for i in range(1000)]
+    expected = ref.isbizday(dates)
+    for _ in range(5):
+        # a fresh index, its chunks are loaded by the threads at once
+        cal = Calendar(anbima.holidays, weekdays=anbima.weekdays, engine="array")
+        barrier = threading.Barrier(8)
+        results = []
+
+        def check():
+            barrier.wait()
+            results.append([cal.isbizday(dt) for dt in dates])
+
+        threads = [threading.Thread(target=check) for _ in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        assert results == [expected] * 8
+        assert cal._index._nloaded == sum(cal._index._loaded)
+        assert cal.isbizday(dates) == expected
+        assert cal.bizdays(dates[:-1], dates[1:]) == ref.bizdays(dates[:-1], dates[1:])
+
+
+def test_calendar_add_remove_holidays(anbima):
+    cal = anbima
+    # loads a few years of the array engine, the others stay lazy
+    assert cal.bizdays("2023-01-01", "2025-12-31") == 753
+    cal2 = cal.add_holidays(["2024-11-21", "2024-11-23", "2050-03-01"])
+    assert cal2.engine == cal.engine
+    assert not cal2.isbizday("2024-11-21")
+    assert not cal2.isbizday("2050-03-01")
+    assert cal.isbizday("2024-11-21")
+    assert cal2.bizdays("2023-01-01", "2025-12-31") == 752
+    assert (
+        cal2.bizdays("2002-01-01", "2090-12-31")
+        == cal.bizdays("2002-01-01", "2090-12-31") - 2
+    )
+    assert cal2.following("2024-11-21") == date(2024, 11, 22)
+    assert cal2.offset("2024-11-19", 1) == date(2024, 11, 22)
+    assert cal2.offset("2050-03-02", -1) == date(2050, 2, 28)
+    assert cal2.getbizdays(2024, 11) == cal.getbizdays(2024, 11) - 1
+    assert len(cal2.holidays) == len(cal.holidays) + 3
+    cal3 = cal2.remove_holidays(["2024-11-21", "2024-12-25", "2024-11-19"])
+    assert cal3.isbizday("2024-11-21")
+    assert cal3.isbizday("2024-12-25")
+    assert cal3.bizdays("2023-01-01", "2025-12-31") == 754
+    assert cal3.seq("2024-12-24", "2024-12-26") == [
+        date(2024, 12, 24),
+        date(2024, 12, 25),
+        date(2024, 12, 26),
+    ]
+    assert cal3.offset("2024-12-31", -5) == date(2024, 12, 24)
+    ref = Calendar(cal3.holidays, weekdays=cal.weekdays, engine=cal.engine)
+    assert cal3.bizdays("2002-01-01", "2090-12-31") == ref.bizdays(
+        "2002-01-01", "2090-12-31"
+    )
+    assert cal.add_holidays("2024-11-23").bizdays(
+        "2002-01-01", "2090-12-31"
+    ) == cal.bizdays("2002-01-01", "2090-12-31")
+    # updates after extending the range backwards
+    cal = Calendar(
+        anbima.holidays,
+        weekdays=anbima.weekdays,
+        startdate="2010-01-01",
+        enddate="2030-12-31",
+        extend=True,
+        engine=cal.engine,
+    )
+    assert cal.isbizday("2005-06-01")
+    assert cal.add_holidays(["2024-11-21"]).seq("2024-11-19", "2024-11-26") == cal2.seq(
+        "2024-11-19", "2024-11-26"
+    )
+    assert cal.remove_holidays(["2024-12-25"]).offset("2024-12-24", 1) == date(
+        2024, 12, 25
+    )
+
+
+def test_calendar_extend(anbima, caplog):
+    ref = Calendar(
+        anbima.holidays,
+        weekdays=anbima.weekdays,
+        startdate="1990-01-01",
+        engine=anbima.engine,
+    )
+    cal = Calendar(
+        anbima.holidays,
+        weekdays=anbima.weekdays,
+        startdate="2010-06-15",
+        enddate="2020-12-31",
+        engine=anbima.engine,
+    )
+    with pytest.raises(DateOutOfRange):
+        cal.offset("2020-12-30", 5)
+    cal.extend = True
+    with caplog.at_level("INFO", logger="bizdays"):
+        assert cal.isbizday("2010-06-15")
+        assert not caplog.records
+        assert cal.offset("2020-12-30", 5) == ref.offset("2020-12-30", 5)
+        assert cal.enddate == date(2021, 12, 31)
+        assert len(caplog.records) == 1
+        assert caplog.records[0].enddate == date(2021, 12, 31)
+        k = cal.bizdays("2015-01-01", "2015-12-31")
+        assert cal.bizdays("1995-03-01", "2035-07-10") == ref.bizdays(
+            "1995-03-01", "2035-07-10"
+        )
+        assert cal.startdate == date(1995, 1, 1)
+        assert cal.enddate == date(2035, 12, 31)
+        assert cal.bizdays("2015-01-01", "2015-12-31") == k
+        assert cal.offset("2010-06-15", -2000) == ref.offset("2010-06-15", -2000)
+        assert cal.modified_preceding("1992-03-01") == ref.modified_preceding(
+            "1992-03-01"
+        )
+        assert cal.seq("1990-12-20", "1991-01-10") == ref.seq(
+            "1990-12-20", "1991-01-10"
+        )
+        assert cal.getdate("last bizday", 2050, 12) == ref.getdate(
+            "last bizday", 2050, 12
+        )
+        assert cal.getbizdays(2060) == ref.getbizdays(2060)
+    assert len(caplog.records) > 3
+    assert pickle.loads(pickle.dumps(cal)).extend
+
+
+@pytest.mark.parametrize("engine", ["array", "dict", "bisect"])
+def test_calendar_union_intersection(engine):
+    anbima = Calendar.load("ANBIMA")
+    ny = Calendar(
+        ["2024-01-01", "2024-07-04", "2024-11-28", "2024-12-25"],
+        weekdays=["Saturday", "Sunday"],
+        startdate="2024-01-01",
+        enddate="2024-12-31",
+        name="NY",
+        engine=engine,
+    )
+    cal = anbima.union(ny, name="ANBIMA+NY")
+    assert cal.name == "ANBIMA+NY"
+    assert cal.startdate == date(2024, 1, 1)
+    assert cal.enddate == date(2024, 12, 31)
+    assert cal.weekdays == ("Saturday", "Sunday")
+    assert cal.bizdays("2024-01-01", "2024-12-31") == 250
+    assert not cal.isbizday("2024-07-04")
+    assert not cal.isbizday("2024-11-20")
+    assert cal.offset("2024-07-03", 1) == date(2024, 7, 5)
+    assert cal.following("2024-11-28") == date(2024, 11, 29)
+    ref = Calendar(
+        sorted(set(anbima.holidays) | set(ny.holidays)),
+        weekdays=["Saturday", "Sunday"],
+        startdate="2024-01-01",
+        enddate="2024-12-31",
+    )
+    assert cal.seq("2024-01-01", "2024-12-31") == ref.seq("2024-01-01", "2024-12-31")
+    cal = anbima.intersection(ny)
+    assert cal.bizdays("2024-01-01", "2024-12-31") == 259
+    assert cal.holidays == [date(2024, 1, 1), date(2024, 12, 25)]
+    assert cal.isbizday("2024-11-20")
+    assert not cal.isbizday("2024-12-25")
+    sat = Calendar(weekdays=["Saturday"])
+    sun = Calendar(weekdays=["Sunday"])
+    assert sat.union(sun).weekdays == ("Saturday", "Sunday")
+    assert sat.intersection(sun).weekdays == ()
+    with pytest.raises(ValueError):
+        ny.union(Calendar(startdate="2025-01-01", enddate="2025-12-31"))
+
+
 def test_calendar_load():
     cal = Calendar.load(name="ANBIMA")
     assert cal.name == "ANBIMA"
@@ -864,5 +1283,203 @@ def test_bizdays_consistency_check():
     assert cal.bizdays("2024-12-23", "2024-12-29") == 1
     assert cal.bizdays("2024-12-29", "2024-12-23") == -1
 
+
+def test_scalar_date_types(anbima):
+    cal = anbima
+    dates = [
+        "2024-11-20",
+        "2024-1-5",
+        date(2024, 11, 20),
+        datetime(2024, 11, 20, 15, 30),
+        np.datetime64("2024-11-20"),
+        Date("2024-11-20"),
+    ]
+    for dt in dates:
+        assert cal.bizdays("2024-01-02", dt) == cal.bizdays(
+            date(2024, 1, 2), Date(dt).date
+        )
+        assert cal.isbizday(dt) is cal.isbizday(Date(dt).date)
+        assert cal.offset(dt, 3) == cal.offset(Date(dt).date, 3)
+    assert cal.bizdays("2024-01-02", "2024-11-21") == 225
+    assert cal.bizdays("2024-11-21", "2024-01-02") == -225
+    assert cal.isbizday("2024-11-20") is False
+    assert cal.isbizday("2024-11-21") is True
+    with pytest.raises(ValueError):
+        cal.isbizday("2024-11-31")
+    with pytest.raises(ValueError):
+        cal.isbizday("20241121")
+    with pytest.raises(ValueError):
+        cal.isbizday("2024-W01-1")
+
+
+def test_vectorized_datetypes(anbima):
+    cal = anbima
+    dates = [date(2024, 11, 19), date(2024, 11, 21), date(2024, 11, 22)]
+    try:
+        assert cal.offset(["2024-11-18", "2024-11-19", "2024-11-21"], 1) == dates
+        assert cal.seq("2024-11-19", "2024-11-22") == dates
+        assert cal.seq("2024-11-22", "2024-11-19") == dates[::-1]
+        set_option("mode.datetype", "datetime")
+        assert cal.seq("2024-11-19", "2024-11-22") == [
+            datetime(d.year, d.month, d.day) for d in dates
+        ]
+        set_option("mode.datetype", "iso")
+        assert cal.offset(["2024-11-18", "2024-11-19", "2024-11-21"], 1) == [
+            d.isoformat() for d in dates
+        ]
+        assert cal.seq("2024-11-22", "2024-11-19") == [
+            d.isoformat() for d in dates[::-1]
+        ]
+    finally:
+        set_option("mode.datetype", None)
+
+
+@pytest.mark.parametrize("engine", ["array", "bisect"])
+def test_vectorized_errors(engine, caplog):
+    cal = Calendar(
+        ["2024-01-01"],
+        weekdays=("Saturday", "Sunday"),
+        startdate="2024-01-01",
+        enddate="2024-12-31",
+        engine=engine,
+    )
+    dates = ["2023-12-29", "2024-01-02", None, "2025-01-02"]
+    with pytest.raises(DateOutOfRange):
+        cal.bizdays(dates, "2024-01-31")
+    with pytest.raises(ValueError):
+        cal.bizdays(dates, "2024-01-31", errors="ignore")
+    # scalars validate errors too
+    with pytest.raises(ValueError):
+        cal.bizdays("2024-01-02", "2024-01-05", errors="ignore")
+    with pytest.raises(ValueError):
+        cal.offset("2024-01-02", 1, errors="ignore")
+    with pytest.raises(ValueError):
+        cal.following("2024-01-02", errors="ignore")
+    with caplog.at_level("WARNING", logger="bizdays"):
+        assert cal.bizdays(dates, "2024-01-31", errors="coerce") == [
+            None,
+            21,
+            None,
+            None,
+        ]
+    assert caplog.records[-1].count == 2
+    assert cal.bizdays(dates, "2024-01-31", errors="clip") == [21, 21, None, -239]
+    assert cal.isbizday(dates, errors="coerce") == [None, True, None, None]
+    assert cal.offset(dates, 1, errors="coerce") == [None, date(2024, 1, 3), None, None]
+    assert cal.following(dates, errors="clip") == [
+        date(2024, 1, 2),
+        date(2024, 1, 2),
+        None,
+        date(2024, 12, 31),
+    ]
+    # dates in the range aren't touched
+    assert cal.bizdays(["2024-01-02"], "2024-01-31", errors="coerce") == [21]
+
+
+def test_vectorized_dict_engine():
+    cal = Calendar(
+        ["2024-01-01"],
+        weekdays=("Saturday", "Sunday"),
+        startdate="2024-01-01",
+        enddate="2024-12-31",
+        engine="dict",
+    )
+    assert cal.bizdays(["2024-01-02"], "2024-01-31") == [21]
+    assert cal.bizdays(["02/01/2024"], "31/01/2024", format="%d/%m/%Y") == [21]
+    assert cal.isbizday(["01/01/2024", "02/01/2024"], format="%d/%m/%Y") == [
+        False,
+        True,
+    ]
+    with pytest.raises(ValueError):
+        cal.bizdays(["2024-01-02"], "2024-01-31", errors="coerce")
+
+
+def test_compile_getdate(anbima):
+    cal = anbima
+    plan = compile_getdate("last bizday")
+    assert compile_getdate("last bizday") is plan
+    assert plan(cal, 2002, 2) == date(2002, 2, 28)
+    assert [plan(cal, 2024, m) for m in (1, 2, 3)] == cal.getdate(
+        "last bizday", 2024, [1, 2, 3]
+    )
+    assert cal.getdate(plan, [2002, 2001], 1) == [date(2002, 1, 31), date(2001, 1, 31)]
+    plan = compile_getdate("3rd bizday after 15th day")
+    assert (
+        plan(cal, 2002, 1)
+        == cal.getdate("3rd bizday after 15th day", 2002, 1)
+        == date(2002, 1, 18)
+    )
+    assert compile_getdate("first wed")(cal, 2002, 2) == date(2002, 2, 6)
+    for expr in (
+        "last foo",
+        "first day around 15th day",
+        "first",
+        "15th day before first wed",
+    ):
+        with pytest.raises(ValueError):
+            compile_getdate(expr)
+
+
+IMPORT_CHECK = """
+import sys
+import bizdays
+HOLIDAYS = ["2023-01-02", "2023-12-25"]
+WEEKDAYS = ["Saturday", "Sunday"]
+cal = {calendar}
+cal.bizdays("2023-01-02", "2023-12-20")
+print("numpy" in sys.modules, "pandas" in sys.modules)
+"""
+
+IMPORT_TIME = """
+import time
+t0 = time.perf_counter()
+import gzip, hashlib, json, logging, re, tempfile, threading, typing
+t1 = time.perf_counter()
+import bizdays
+t2 = time.perf_counter()
+import numpy
+t3 = time.perf_counter()
+print(t1 - t0, t2 - t1, t3 - t2)
+"""
+
+
+def _run_python(code, **env):
+    return subprocess.run(
+        [sys.executable, "-c", code],
+        capture_output=True,
+        text=True,
+        check=True,
+        cwd=os.path.dirname(os.path.abspath(__file__)),
+        env=dict(os.environ, **env),
+    ).stdout.split()
+
+
+@pytest.mark.parametrize(
+    "calendar, numpy",
+    [
+        ('bizdays.Calendar(HOLIDAYS, WEEKDAYS, engine="dict")', False),
+        # the other engines, the default one included, and Calendar.load are
+        # built on NumPy, so they import it, but not pandas
+        ("bizdays.Calendar(HOLIDAYS, WEEKDAYS)", True),
+        ('bizdays.Calendar.load("ANBIMA")', True),
+    ],
+)
+def test_import_is_lazy(calendar, numpy, cache_dir):
+    code = IMPORT_CHECK.format(calendar=calendar)
+    out = _run_python(code, XDG_CACHE_HOME=str(cache_dir))
+    assert out == [str(numpy), "False"]
+
+
+def test_import_time():
+    # the import is timed without compiling the module
+    py_compile.compile(
+        os.path.join(os.path.dirname(os.path.abspath(__file__)), "bizdays.py")
+    )
+    stdlib, own, numpy = map(float, _run_python(IMPORT_TIME))
+    # with its stdlib dependencies loaded, bizdays costs a small share of
+    # the NumPy import it used to pay for
+    assert own < numpy / 2
+
+
 if __name__ == "__main__":
     unittest.main(verbosity=1)
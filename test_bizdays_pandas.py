@@ -59,12 +59,24 @@ def test_isbizday_with_datetimeindex(actual):
 def test_isbizday_with_datetimeindex_and_nat(actual):
     dt = pd.to_datetime(["2021-12-30", "2021-11-30", None])
     x = actual.isbizday(dt)
-    assert isinstance(x, np.ndarray)
+    assert x.dtype == "boolean"
     assert x[0]
     assert pd.isna(x[2])
     assert [pd.NaT] == [pd.NaT]
 
 
+def test_isbizday_with_series_and_nat():
+    cal = Calendar(weekdays=("Saturday", "Sunday"))
+    dt = pd.Series(pd.to_datetime(["2021-12-24", "2021-12-25", None]))
+    x = cal.isbizday(dt)
+    assert x.dtype == "boolean"
+    assert x[0] and not x[1]
+    assert pd.isna(x[2])
+    x = cal.isbizday(dt.dropna().values)
+    assert x.dtype == bool
+    assert list(x) == [True, False]
+
+
 def test_bizdays_with_datetimeindex(actual):
     dt1 = pd.to_datetime(["2021-12-30", "2021-11-30"])
     dt2 = pd.to_datetime(["2021-12-30", "2021-11-30"])
@@ -73,6 +85,15 @@ def test_bizdays_with_datetimeindex(actual):
     assert np.all(x == np.array([0, 0]))
 
 
+def test_bizdays_with_datetimeindex_and_weekends():
+    cal = Calendar(weekdays=("Saturday", "Sunday"))
+    dt1 = pd.to_datetime(["2021-12-24", "2021-12-25", "2021-12-26"])
+    dt2 = pd.to_datetime(["2021-12-31", "2021-12-26", "2021-12-24"])
+    x = cal.bizdays(dt1, dt2)
+    assert isinstance(x, np.ndarray)
+    assert list(x) == [5, 0, 0]
+
+
 def test_adjust_with_datetimeindex(actual):
     dt = pd.to_datetime(["2021-12-30", "2021-11-30"])
     x = actual.following(dt)
@@ -98,6 +119,17 @@ def test_offset_with_datetimeindex(actual):
     assert all(actual.offset(dt, [5, 6]) == dts.date)
 
 
+def test_offset_with_series_and_arrays():
+    cal = Calendar(weekdays=("Saturday", "Sunday"))
+    dt = pd.Series(pd.to_datetime(["2021-01-01", "2021-01-02"]))
+    x = cal.offset(dt, np.array([1, 2]))
+    assert isinstance(x, pd.DatetimeIndex)
+    assert all(x == pd.to_datetime(["2021-01-04", "2021-01-05"]))
+    dt = np.array(["2021-01-01", "2021-01-04"], dtype="datetime64[D]")
+    x = cal.offset(dt, pd.Series([-1]))
+    assert all(x == pd.to_datetime(["2020-12-31", "2021-01-01"]))
+
+
 def test_offset_with_datetimeindex_and_nat(actual):
     dt = pd.to_datetime(["2021-01-01", "2021-01-02", pd.NaT])
     x = actual.offset(dt, 5)
@@ -105,4 +137,68 @@ def test_offset_with_datetimeindex_and_nat(actual):
 
 
 def test_seq_return_datetimeindex(actual):
-    actual.seq("2014-01-02", "2014-01-07")
+    x = actual.seq("2014-01-02", "2014-01-07")
+    assert isinstance(x, pd.DatetimeIndex)
+    assert list(actual.seq("2014-01-07", "2014-01-02")) == list(x[::-1])
+
+
+def test_vectorized_inputs():
+    cal = Calendar(
+        ["2024-01-01"],
+        weekdays=("Saturday", "Sunday"),
+        startdate="2023-01-01",
+        enddate="2024-12-31",
+    )
+    expected = [False, True, True, False]
+    dts = pd.to_datetime(
+        ["2024-01-01 10:00", "2024-01-02 23:30", "2024-01-03", "2024-01-06"],
+        format="ISO8601",
+    )
+    assert list(cal.isbizday(dts)) == expected
+    assert list(cal.isbizday(pd.Series(dts))) == expected
+    assert list(cal.isbizday(dts.values.astype("datetime64[s]"))) == expected
+    assert list(cal.isbizday(list(dts.to_pydatetime()))) == expected
+    assert list(cal.isbizday(list(dts.date))) == expected
+    # tz-aware dates keep their local dates
+    tz = pd.Series(dts.tz_localize("America/Sao_Paulo"))
+    assert list(cal.isbizday(tz)) == expected
+    assert list(cal.isbizday(tz.dt.tz_convert("America/Los_Angeles"))) == [
+        False,
+        True,
+        True,
+        True,
+    ]
+    assert list(cal.isbizday(["01/01/2024", "02/01/2024"], format="%d/%m/%Y")) == [
+        False,
+        True,
+    ]
+    assert list(cal.bizdays(["01/01/2024"], ["31/01/2024"], format="%d/%m/%Y")) == [21]
+    assert list(cal.offset(["29/12/2023", "02/01/2024"], 1, format="%d/%m/%Y")) == list(
+        pd.to_datetime(["2024-01-02", "2024-01-03"])
+    )
+    assert cal.following("01/01/2024", format="%d/%m/%Y") == pd.Timestamp("2024-01-02")
+    assert cal.bizdays("01/01/2024", "31/01/2024", format="%d/%m/%Y") == 21
+    # integers aren't dates
+    with pytest.raises(ValueError):
+        cal.isbizday([1, 2])
+    with pytest.raises(ValueError):
+        cal.isbizday(pd.Series([20240105]))
+
+
+def test_vectorized_nulls():
+    cal = Calendar(
+        weekdays=("Saturday", "Sunday"), startdate="2021-01-01", enddate="2021-12-31"
+    )
+    dt = pd.Series(pd.to_datetime(["2021-12-24", None, "2021-12-25", None]))
+    x = cal.bizdays(dt, "2021-12-31")
+    assert x.dtype == "Int64"
+    assert list(x.isna()) == [False, True, False, True]
+    assert list(x[[0, 2]]) == [5, 4]
+    x = cal.offset(dt, 1)
+    assert isinstance(x, pd.DatetimeIndex)
+    assert list(x.isna()) == [False, True, False, True]
+    assert x[0] == pd.Timestamp("2021-12-27")
+    x = cal.following(dt)
+    assert x[2] == pd.Timestamp("2021-12-27") and pd.isna(x[3])
+    # null dates aren't range checked
+    assert cal.isbizday(pd.Series([pd.NaT, pd.NaT])).isna().all()
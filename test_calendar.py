@@ -1,4 +1,20 @@
-from bizdays import Calendar
+import gzip
+import os
+import pickle
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date
+
+import numpy as np
+from bizdays import (
+    Calendar,
+    CalendarRegistry,
+    CalendarSet,
+    DateOutOfRange,
+    get_calendar,
+    registry,
+    set_option,
+)
 import pytest
 
 
@@ -18,3 +34,273 @@ def test_calendar_load_pmc():
     cal = Calendar.load("PMC/B3")
     assert cal.name == "PMC/B3"
     assert len(cal.holidays) > 4000
+
+
+def test_calendar_load_cache(tmp_path):
+    set_option("cache.dir", str(tmp_path))
+    try:
+        set_option("cache", False)
+        cal1 = Calendar.load("ANBIMA")
+        assert list(tmp_path.iterdir()) == []
+        set_option("cache", True)
+        cal2 = Calendar.load("ANBIMA")
+        assert len(list(tmp_path.glob("*.npy"))) == 1
+        cal3 = Calendar.load("ANBIMA")
+    finally:
+        set_option("cache", True)
+        set_option("cache.dir", None)
+    for cal in (cal2, cal3):
+        assert cal.name == "ANBIMA"
+        assert cal.holidays == cal1.holidays
+        assert cal._nonwork_weekdays == cal1._nonwork_weekdays
+        assert cal.bizdays("2002-01-01", "2023-12-31") == cal1.bizdays(
+            "2002-01-01", "2023-12-31"
+        )
+
+
+def test_calendar_load_pmc_cache(tmp_path, monkeypatch):
+    set_option("cache.dir", str(tmp_path))
+    try:
+        cal1 = Calendar.load("PMC/B3")
+        assert len(list(tmp_path.glob("*.npy"))) == 1
+        # a cached calendar doesn't import pandas_market_calendars
+        monkeypatch.setitem(sys.modules, "pandas_market_calendars", None)
+        cal2 = Calendar.load("PMC/B3")
+    finally:
+        set_option("cache.dir", None)
+    assert cal2.name == "PMC/B3"
+    assert cal2.weekdays == ("Saturday", "Sunday")
+    assert cal2.holidays == cal1.holidays
+    assert cal2.bizdays("2002-01-01", "2023-12-31") == cal1.bizdays(
+        "2002-01-01", "2023-12-31"
+    )
+
+
+def test_calendar_load_cache_file(tmp_path):
+    fname = tmp_path / "Test.cal"
+    fname.write_text("Saturday\nSunday\n2023-01-02\n2023-01-03\n2023-12-25\n")
+    set_option("cache.dir", str(tmp_path / "cache"))
+    try:
+        cal1 = Calendar.load(filename=str(fname))
+        fname.write_text("Saturday\nSunday\n2023-01-02\n2023-12-25\n")
+        cal2 = Calendar.load(filename=str(fname))
+    finally:
+        set_option("cache.dir", None)
+    assert len(list((tmp_path / "cache").glob("*.npy"))) == 2
+    assert cal1.bizdays("2023-01-02", "2023-01-06") == 2
+    assert cal2.bizdays("2023-01-02", "2023-01-06") == 3
+
+
+def test_calendar_load_all(tmp_path):
+    text = """
+[Test]
+Saturday
+Sunday
+2023-01-02
+2023-12-25
+
+[Test 2]
+sunday
+2023-01-03
+"""
+    fname = tmp_path / "calendars.cal.gz"
+    with gzip.open(fname, "wt") as f:
+        f.write(text)
+    cals = Calendar.load_all(str(fname))
+    assert list(cals) == ["Test", "Test 2"]
+    assert cals["Test"].name == "Test"
+    assert cals["Test"].weekdays == ("Saturday", "Sunday")
+    assert cals["Test"].bizdays("2023-01-02", "2023-01-06") == 3
+    assert cals["Test 2"].weekdays == ("Sunday",)
+    assert cals["Test 2"].holidays == [date(2023, 1, 3)]
+    with pytest.raises(Exception):
+        Calendar.load(filename=str(fname))
+    fname = tmp_path / "Test.cal.gz"
+    with gzip.open(fname, "wt") as f:
+        f.write("Saturday\nSunday\n2023-01-02\n2023-12-25\n")
+    cal = Calendar.load(filename=str(fname))
+    assert cal.name == "Test"
+    assert list(Calendar.load_all(str(fname))) == ["Test"]
+    assert cal.holidays == [date(2023, 1, 2), date(2023, 12, 25)]
+
+
+def test_calendar_registry():
+    reg = CalendarRegistry()
+    cal = reg.get("B3")
+    assert reg.get("B3") is cal
+    assert reg.get(name="ANBIMA") is not cal
+    assert "B3" in reg
+    st = reg.stats()
+    assert st["hits"] == 1
+    assert st["misses"] == 2
+    assert st["size"] == 2
+    assert st["nbytes"] > 0
+    assert reg.invalidate("B3") == 1
+    assert "B3" not in reg
+    assert reg.get("B3") is not cal
+    assert reg.invalidate() == 2
+    assert len(reg) == 0
+
+
+def test_calendar_registry_lru():
+    reg = CalendarRegistry(maxsize=2)
+    b3 = reg.get("B3")
+    reg.get("ANBIMA")
+    reg.get("B3")
+    reg.get("Actual")
+    assert "ANBIMA" not in reg
+    assert reg.get("B3") is b3
+    assert reg.stats()["evictions"] == 1
+    reg.maxsize = 1
+    assert len(reg) == 1
+    assert "B3" in reg
+
+
+def test_calendar_registry_file(tmp_path):
+    fname = tmp_path / "Test.cal"
+    fname.write_text("Saturday\nSunday\n2023-01-02\n2023-12-25\n")
+    reg = CalendarRegistry()
+    cal = reg.get(filename=str(fname))
+    assert reg.get(filename=str(fname)) is cal
+    fname.write_text("Saturday\nSunday\n2023-01-02\n2023-01-03\n2023-12-25\n")
+    os.utime(fname, ns=(0, 0))
+    cal2 = reg.get(filename=str(fname))
+    assert cal2 is not cal
+    assert len(cal2.holidays) == 3
+    assert len(reg) == 1
+    assert reg.invalidate(filename=str(fname)) == 1
+
+
+def test_get_calendar():
+    assert get_calendar("B3") is get_calendar("B3")
+    assert get_calendar("B3") is registry.get("B3")
+    cal = get_calendar("B3")
+    for attr, value in [("financial", False), ("extend", True), ("name", "X")]:
+        with pytest.raises(AttributeError):
+            setattr(cal, attr, value)
+    assert cal.financial and not cal.extend and cal.name == "B3"
+    cal2 = cal.add_holidays(["2024-11-21"])
+    cal2.financial = False
+    assert not cal2.financial
+
+
+def test_calendar_set():
+    actual = Calendar(name="Actual", financial=False)
+    cset = CalendarSet(["ANBIMA", "B3", actual], startdate="2020-01-01")
+    assert cset.names == ["ANBIMA", "B3", "Actual"]
+    assert cset.calendars[0] is get_calendar("ANBIMA")
+    assert cset.startdate.isoformat() == "2020-01-01"
+    dates = ["2024-11-20", "2024-11-21", "2024-11-23"]
+    assert cset.isbizday(dates).tolist() == [
+        [cal.isbizday(dt) for dt in dates] for cal in cset.calendars
+    ]
+    bdays = cset.bizdays(dates, "2024-12-31")
+    assert bdays.shape == (3, 3)
+    assert bdays.tolist() == [
+        [cal.bizdays(dt, "2024-12-31") for dt in dates] for cal in cset.calendars
+    ]
+    assert cset.bizdays("2024-12-31", dates).tolist() == (-bdays).tolist()
+    res = cset.offset(dates, [0, 1, -2])
+    assert res.dtype.str == "<M8[D]"
+    expected = [
+        [cal.offset(dt, n) for dt, n in zip(dates, [0, 1, -2])]
+        for cal in cset.calendars
+    ]
+    assert (res == np.array(expected, dtype="datetime64[D]")).all()
+    with pytest.raises(DateOutOfRange):
+        cset.isbizday(["2019-12-31"])
+    with pytest.raises(DateOutOfRange):
+        cset.offset(cset.enddate, 1)
+
+
+def test_calendar_registry_dispatch():
+    calendars = ["B3", "ANBIMA", "Actual", "B3", "Actual"]
+    trades = ["2024-11-19", "2024-11-20", "2024-11-23", "2024-12-24", "2024-12-25"]
+    maturities = ["2025-01-02", "2024-11-25", "2024-12-01", "2025-06-30", "2025-01-01"]
+    bdays = registry.bizdays(trades, maturities, calendars)
+    assert list(bdays) == [
+        get_calendar(c).bizdays(t, m) for c, t, m in zip(calendars, trades, maturities)
+    ]
+    res = registry.offset(trades, [1, 2, 3, -1, 0], calendars)
+    expected = [
+        get_calendar(c).offset(t, n)
+        for c, t, n in zip(calendars, trades, [1, 2, 3, -1, 0])
+    ]
+    assert (
+        np.array(res, dtype="datetime64[D]")
+        == np.array(expected, dtype="datetime64[D]")
+    ).all()
+    assert list(registry.isbizday(trades, calendars)) == [
+        get_calendar(c).isbizday(t) for c, t in zip(calendars, trades)
+    ]
+    assert list(registry.isbizday(trades, "B3")) == list(
+        get_calendar("B3").isbizday(trades)
+    )
+
+
+def test_calendar_pickle():
+    cal = Calendar.load("ANBIMA")
+    cal.bizdays("2002-01-01", "2023-12-31")
+    data = pickle.dumps(cal)
+    assert len(data) < 20000
+    cal2 = pickle.loads(data)
+    assert cal2.name == cal.name
+    assert cal2.holidays == cal.holidays
+    assert cal2.weekdays == cal.weekdays
+    assert cal2.startdate == cal.startdate
+    assert cal2.enddate == cal.enddate
+    assert cal2.bizdays("2002-01-01", "2023-12-31") == cal.bizdays(
+        "2002-01-01", "2023-12-31"
+    )
+    cal = Calendar(
+        cal.holidays[:10],
+        ["Saturday", "Sunday"],
+        name="Test",
+        financial=False,
+        engine="dict",
+    )
+    cal2 = pickle.loads(pickle.dumps(cal))
+    assert cal2.engine == "dict"
+    assert cal2.financial is False
+    assert cal2.holidays == cal.holidays
+    assert cal2.enddate == cal.enddate
+
+
+def _bizdays_in_worker(cal):
+    return (
+        cal.name,
+        cal.bizdays("2002-01-01", "2023-12-31"),
+        cal.offset("2023-12-22", 1),
+    )
+
+
+def test_calendar_share():
+    cal = Calendar.load("ANBIMA")
+    shm = cal.share()
+    try:
+        shared = Calendar.attach(shm.name)
+        assert Calendar.attach(shm.name) is shared
+        assert len(pickle.dumps(shared)) < 200
+        assert pickle.loads(pickle.dumps(shared)) is shared
+        assert shared.name == "ANBIMA"
+        assert shared.startdate == cal.startdate
+        assert shared.enddate == cal.enddate
+        assert shared.weekdays == cal.weekdays
+        assert shared.holidays == sorted(set(cal.holidays))
+        assert shared.bizdays("2002-01-01", "2023-12-31") == cal.bizdays(
+            "2002-01-01", "2023-12-31"
+        )
+        assert shared.getdate("last bizday", 2023, 12) == cal.getdate(
+            "last bizday", 2023, 12
+        )
+        with ProcessPoolExecutor(max_workers=1) as executor:
+            res = executor.submit(_bizdays_in_worker, shared).result()
+        assert res == ("ANBIMA", 5525, cal.offset("2023-12-22", 1))
+        # a detached calendar is attached again from the block
+        Calendar.detach(shm.name)
+        shared = Calendar.attach(shm.name)
+        assert shared.offset("2023-12-22", 1) == cal.offset("2023-12-22", 1)
+    finally:
+        Calendar.detach(shm.name)
+        shm.close()
+        shm.unlink()